@@ -0,0 +1,318 @@
+"""
+Deterministic local stand-ins for the Scout's external services: SerpApi,
+the Bedrock runtime (Claude + Titan), S3 and yfinance.
+
+Every response is a pure function of the request, and every injected delay
+is drawn from a LatencyModel seeded by the request, so two runs over the same
+portfolio do identical work and sleep for identical amounts of time.
+"""
+import hashlib
+import io
+import json
+import math
+import random
+import re
+import threading
+import time
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+from src.scout.serp_client import SerpClient
+
+SECTORS = ["Technology", "Financial Services", "Healthcare", "Energy", "Consumer Cyclical",
+           "Industrials", "Communication Services", "Utilities"]
+
+# Default per-service latency (milliseconds). Deliberately far below the live
+# services so 1000-holding runs finish in minutes; the ratios between services
+# are what matter for spotting which stage dominates.
+DEFAULT_LATENCIES = {
+    "serp": "lognormal:40:0.5",
+    "bedrock": "lognormal:120:0.4",
+    "embedding": "lognormal:15:0.3",
+    "s3": "lognormal:10:0.3",
+    "yf_info": "lognormal:30:0.5",
+    "yf_download": "lognormal:60:0.5"
+}
+
+
+def _seed(*parts: Any) -> int:
+    return int.from_bytes(hashlib.sha256("\0".join(map(str, parts)).encode("utf-8")).digest()[:8], "big")
+
+
+class LatencyModel:
+    """
+    Delay distribution for one service, parsed from "kind:params" (in ms):
+
+    - "none"
+    - "fixed:MS"
+    - "uniform:LOW:HIGH"
+    - "lognormal:MEDIAN:SIGMA"
+
+    sample(key) is deterministic per (seed, key); scale multiplies every delay.
+    """
+
+    def __init__(self, spec: str, seed: int = 0, scale: float = 1.0):
+        self.spec = spec
+        self.seed = seed
+        self.scale = scale
+        kind, *params = spec.split(":")
+        self.kind = kind
+        self.params = [float(p) for p in params]
+        if kind not in ("none", "fixed", "uniform", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {spec}")
+
+    def sample(self, key: str) -> float:
+        """Delay in seconds for the request identified by key."""
+        rng = random.Random(_seed(self.seed, self.spec, key))
+        if self.kind == "none":
+            ms = 0.0
+        elif self.kind == "fixed":
+            ms = self.params[0]
+        elif self.kind == "uniform":
+            ms = rng.uniform(self.params[0], self.params[1])
+        else:
+            ms = self.params[0] * math.exp(rng.gauss(0.0, self.params[1]))
+        return ms * self.scale / 1000.0
+
+    def wait(self, key: str):
+        delay = self.sample(key)
+        if delay > 0:
+            time.sleep(delay)
+
+
+def build_latencies(overrides: Optional[Dict[str, str]] = None, seed: int = 0,
+                    scale: float = 1.0) -> Dict[str, LatencyModel]:
+    specs = {**DEFAULT_LATENCIES, **(overrides or {})}
+    return {name: LatencyModel(spec, seed=seed, scale=scale) for name, spec in specs.items()}
+
+
+class _Body:
+    """Mimics botocore's StreamingBody."""
+
+    def __init__(self, payload: bytes):
+        self._stream = io.BytesIO(payload)
+
+    def read(self, *args) -> bytes:
+        return self._stream.read(*args)
+
+
+class FakeBedrockRuntime:
+    """
+    Answers invoke_model for Titan embeddings and for the Scout / Advisor
+    prompts with well-formed responses (including token usage), so every
+    parsing path runs exactly as it does against Bedrock.
+    """
+
+    def __init__(self, latencies: Dict[str, LatencyModel], embedding_dim: int = 1536):
+        self.latencies = latencies
+        self.embedding_dim = embedding_dim
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def invoke_model(self, body: str, modelId: str, **kwargs) -> Dict[str, Any]:
+        with self._lock:
+            self.calls += 1
+        request = json.loads(body)
+        key = hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+        if "inputText" in request:
+            self.latencies["embedding"].wait(key)
+            rng = random.Random(_seed("embedding", request["inputText"]))
+            payload = {
+                "embedding": [rng.gauss(0.0, 1.0) for _ in range(self.embedding_dim)],
+                "inputTextTokenCount": len(request["inputText"]) // 4
+            }
+        else:
+            self.latencies["bedrock"].wait(key)
+            prompt = request["messages"][0]["content"]
+            text = self._complete(request.get("system", ""), prompt, key)
+            payload = {
+                "content": [{"type": "text", "text": text}],
+                "stop_reason": "end_turn",
+                "usage": {
+                    "input_tokens": (len(request.get("system", "")) + len(prompt)) // 4,
+                    "output_tokens": len(text) // 4
+                }
+            }
+
+        return {
+            "body": _Body(json.dumps(payload).encode("utf-8")),
+            "ResponseMetadata": {"HTTPStatusCode": 200, "RetryAttempts": 0}
+        }
+
+    def invoke_model_with_response_stream(self, body: str, modelId: str, **kwargs) -> Dict[str, Any]:
+        """
+        Streams the same completion invoke_model would return in ~20 character
+        deltas: a fifth of the sampled latency passes before the first token,
+        the rest is spread across the chunks.
+        """
+        with self._lock:
+            self.calls += 1
+        request = json.loads(body)
+        key = hashlib.sha256(body.encode("utf-8")).hexdigest()
+        prompt = request["messages"][0]["content"]
+        text = self._complete(request.get("system", ""), prompt, key)
+        total = self.latencies["bedrock"].sample(key)
+        chunks = [text[i:i + 20] for i in range(0, len(text), 20)]
+
+        def events():
+            def event(payload):
+                return {"chunk": {"bytes": json.dumps(payload).encode("utf-8")}}
+
+            time.sleep(total * 0.2)
+            yield event({"type": "message_start", "message": {"usage": {
+                "input_tokens": (len(request.get("system", "")) + len(prompt)) // 4}}})
+            for chunk in chunks:
+                time.sleep(total * 0.8 / len(chunks))
+                yield event({"type": "content_block_delta", "delta": {"type": "text_delta", "text": chunk}})
+            yield event({"type": "message_delta", "delta": {"stop_reason": "end_turn"},
+                         "usage": {"output_tokens": len(text) // 4}})
+            yield event({"type": "message_stop"})
+
+        return {"body": events(), "ResponseMetadata": {"HTTPStatusCode": 200, "RetryAttempts": 0}}
+
+    @staticmethod
+    def _complete(system_prompt: str, prompt: str, key: str) -> str:
+        rng = random.Random(_seed("completion", key))
+        if "Chief Risk Officer" in system_prompt:
+            return json.dumps({
+                "verdict": rng.choice(["Critical Risk", "Elevated Risk", "Neutral", "Opportunity"]),
+                "confidence": rng.randint(40, 95),
+                "synthesis": "Synthetic synthesis of current news against historical archetypes. " * 3,
+                "action_plan": ["Review position sizing", "Monitor guidance", "Hedge sector exposure"]
+            })
+        ids = [int(i) for i in re.findall(r"ID: (\d+)", prompt)]
+        if ids:
+            # Filter / rerank: keep roughly a third of the storylines.
+            keep = [i for i in ids if rng.random() < 0.35] or ids[:1]
+            return json.dumps([
+                {"id": i, "score": rng.randint(3, 10), "reason": "Synthetic material event."} for i in keep
+            ])
+        return ("Synthetic analysis paragraph connecting the supplied developments. " * 6 + "\n\n") * 2
+
+
+class FakeS3:
+    """put_object/upload_file that only count bytes."""
+
+    def __init__(self, latencies: Dict[str, LatencyModel]):
+        self.latencies = latencies
+        self.objects = 0
+        self.bytes = 0
+        self._lock = threading.Lock()
+
+    def put_object(self, Bucket: str, Key: str, Body: Any, **kwargs) -> Dict[str, Any]:
+        self.latencies["s3"].wait(Key)
+        with self._lock:
+            self.objects += 1
+            self.bytes += len(Body)
+        return {"ResponseMetadata": {"HTTPStatusCode": 200}}
+
+    def upload_file(self, Filename: str, Bucket: str, Key: str, **kwargs):
+        self.latencies["s3"].wait(Key)
+        with self._lock:
+            self.objects += 1
+
+
+class FakeBoto3:
+    """Replacement for boto3.client(...) that hands out the fakes above."""
+
+    def __init__(self, latencies: Dict[str, LatencyModel]):
+        self.bedrock = FakeBedrockRuntime(latencies)
+        self.s3 = FakeS3(latencies)
+
+    def client(self, service_name: str = None, *args, **kwargs):
+        service_name = service_name or kwargs.get("service_name")
+        if service_name == "bedrock-runtime":
+            return self.bedrock
+        if service_name == "s3":
+            return self.s3
+        raise ValueError(f"No fake for boto3 service: {service_name}")
+
+
+class FakeSerpClient(SerpClient):
+    """
+    SerpClient with only the HTTP request replaced, so caching, the per-key
+    semaphore and result standardization are all exercised. Each query
+    returns results_per_query articles, a share of which are syndicated
+    copies of one another (to exercise near-duplicate clustering).
+    """
+
+    def __init__(self, latencies: Dict[str, LatencyModel], results_per_query: int = 10,
+                 syndication_rate: float = 0.3, **kwargs):
+        super().__init__(api_key="benchmark", **kwargs)
+        self.latencies = latencies
+        self.results_per_query = results_per_query
+        self.syndication_rate = syndication_rate
+
+    def _fetch(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        query = params["q"]
+        with self._slots:
+            self.latencies["serp"].wait(query)
+        rng = random.Random(_seed("serp", query))
+        outlets = ["Reuters", "Bloomberg", "MarketWatch", "Yahoo Finance", "CNBC", "Barron's"]
+        news = []
+        for n in range(self.results_per_query):
+            outlet = rng.choice(outlets)
+            if news and rng.random() < self.syndication_rate:
+                # Syndicated copy: same story, different outlet and URL.
+                original = rng.choice(news)
+                title, snippet = original["title"].rsplit(" - ", 1)[0], original["snippet"]
+            else:
+                words = " ".join(rng.choice(["supply", "guidance", "probe", "merger", "margin", "outage",
+                                             "lawsuit", "upgrade", "recall", "buyback"]) for _ in range(6))
+                title = f"{query}: {words} (story {n})"
+                snippet = f"{query} reported {words} in story {n}. " * 3
+            news.append({
+                "title": f"{title} - {outlet}",
+                "link": f"https://news.example/{_seed(query, n):x}",
+                "snippet": snippet,
+                "source": outlet,
+                "date": "1 day ago"
+            })
+        return {"news_results": news}
+
+
+class FakeYFinance:
+    """yf.Ticker(...).info and yf.download(...) backed by seeded random walks."""
+
+    def __init__(self, latencies: Dict[str, LatencyModel]):
+        self.latencies = latencies
+        self.downloads = 0
+        self._lock = threading.Lock()
+
+    def Ticker(self, symbol: str):
+        latencies = self.latencies
+
+        class _Ticker:
+            @property
+            def info(self) -> Dict[str, Any]:
+                latencies["yf_info"].wait(symbol)
+                rng = random.Random(_seed("info", symbol))
+                return {
+                    "longName": f"{symbol} Holdings Inc.",
+                    "sector": rng.choice(SECTORS),
+                    "companyOfficers": [{"title": "Chief Executive Officer", "name": f"CEO of {symbol}"}]
+                }
+
+        return _Ticker()
+
+    def download(self, ticker: str, start: date = None, end: date = None, progress: bool = False, **kwargs):
+        import numpy as np
+        import pandas as pd
+
+        self.latencies["yf_download"].wait(f"{ticker}|{start}|{end}")
+        with self._lock:
+            self.downloads += 1
+        index = pd.bdate_range(start, end - timedelta(days=1))
+        if len(index) == 0:
+            return pd.DataFrame({"Close": []})
+        # Prices are a smooth function of (ticker, day), so overlapping downloads agree.
+        days = index.values.astype("datetime64[D]").astype(np.int64)
+        phase = (_seed("phase", ticker) % 1000) / 100.0
+        base = 50 + _seed("base", ticker) % 200
+        prices = base * np.exp(0.3 * np.sin(days / 90.0 + phase) + 0.05 * np.sin(days / 7.0 + 2 * phase))
+        return pd.DataFrame({"Close": prices}, index=index)
+
+def synthetic_portfolio(size: int, prefix: str = "B") -> List[Dict[str, Any]]:
+    """size holdings with unique symbols ({prefix}{size}X0001...) and equal weights."""
+    return [{"symbol": f"{prefix}{size}X{i:04d}", "weight": round(1.0 / size, 6)} for i in range(1, size + 1)]
@@ -0,0 +1,218 @@
+"""
+Offline throughput benchmark for the full Scout pipeline.
+
+Runs lambda_handler end to end over synthetic portfolios with SerpApi,
+Bedrock, S3 and yfinance replaced by the deterministic fakes in fakes.py,
+and reports per portfolio size:
+
+- end-to-end wall time and throughput (holdings/s)
+- per-stage latency percentiles (from the run's trace spans)
+- Bedrock call counts and tokens (from config.model_usage)
+- peak traced Python memory and process max RSS
+
+Every run is appended to data/benchmarks/pipeline.jsonl with the git commit
+and settings, so results can be compared over time.
+
+All caches, traces and outputs go to a scratch directory, so each size starts
+cold and nothing under ./data is overwritten. Holdings get unique symbols per
+size; archetype price history is shared, so it is warm after the first size.
+
+Usage:
+    python -m src.benchmarks.pipeline_bench --sizes 10 100 1000
+    python -m src.benchmarks.pipeline_bench --sizes 100 --workers 16 --latency serp=fixed:200 --latency-scale 0.5
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Dict, List
+
+RESULTS_PATH = "data/benchmarks/pipeline.jsonl"
+
+
+def _configure_environment(scratch: str, backend: str):
+    """Must run before anything under src is imported: these are read at import time."""
+    os.environ["SENTINEL_CACHE_DIR"] = os.path.join(scratch, "cache")
+    os.environ["SENTINEL_TRACE_DIR"] = os.path.join(scratch, "traces")
+    os.environ["SENTINEL_METRICS_PATH"] = os.path.join(scratch, "scout_metrics.json")
+    os.environ["SENTINEL_LIVE_RESULTS_PATH"] = os.path.join(scratch, "scout_live.json")
+    os.environ["SENTINEL_RUN_JOURNAL_DIR"] = os.path.join(scratch, "runs")
+    os.environ["PRICE_STORE_DIR"] = os.path.join(scratch, "prices")
+    os.environ["HISTORIAN_BACKEND"] = backend
+    os.environ["HISTORIAN_INDEX_PATH"] = os.path.join(scratch, "archetype_index")
+    os.environ["SERPAPI_API_KEY"] = "benchmark"
+
+
+def _install_fakes(latencies, results_per_query: int, scratch: str):
+    """Points boto3, yfinance and the Scout's search client at the fakes."""
+    import boto3
+    import yfinance
+
+    from .fakes import FakeBoto3, FakeSerpClient, FakeYFinance
+
+    fake_boto3 = FakeBoto3(latencies)
+    fake_yf = FakeYFinance(latencies)
+    boto3.client = fake_boto3.client
+    yfinance.Ticker = fake_yf.Ticker
+    yfinance.download = fake_yf.download
+
+    from src.scout import lambda_handler as handler
+
+    handler.search_client = FakeSerpClient(latencies, results_per_query=results_per_query)
+    handler.OUTPUT_PATH = os.path.join(scratch, "scout_latest.json")
+    return handler, fake_boto3, fake_yf
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    ordered = sorted(values)
+
+    def pct(p):
+        return round(ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))], 2)
+
+    return {
+        "count": len(ordered),
+        "p50_ms": pct(50),
+        "p95_ms": pct(95),
+        "p99_ms": pct(99),
+        "max_ms": round(ordered[-1], 2),
+        "total_ms": round(sum(ordered), 2),
+        "mean_ms": round(statistics.fmean(ordered), 2)
+    }
+
+
+def stage_latencies(events: List[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    """Latency percentiles per span name, from Chrome trace events."""
+    durations: Dict[str, List[float]] = {}
+    for event in events:
+        if event.get("ph") == "X":
+            durations.setdefault(event["name"], []).append(event["dur"] / 1000.0)
+    return {name: _percentiles(values) for name, values in sorted(durations.items())}
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return "unknown"
+
+
+def run_size(handler, size: int, workers: int, trace_memory: bool, verbose: bool) -> Dict[str, Any]:
+    from src.infrastructure.tracing import get_tracer
+    from .fakes import synthetic_portfolio
+
+    event = {
+        "portfolio": synthetic_portfolio(size),
+        "max_workers": workers,
+        "trace": True,
+        "output_format": "compact"
+    }
+
+    if trace_memory:
+        tracemalloc.start()
+    sink = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    started = time.perf_counter()
+    with sink:
+        response = handler.lambda_handler(event, None)
+    elapsed = time.perf_counter() - started
+    peak_bytes = None
+    if trace_memory:
+        peak_bytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    if response.get("statusCode") != 200:
+        raise RuntimeError(f"lambda_handler failed for size {size}: {response.get('body')}")
+    body = json.loads(response["body"])
+    config = body.get("config", {})
+    holdings = body.get("data", {}).get("holdings", {})
+
+    return {
+        "size": size,
+        "wall_s": round(elapsed, 3),
+        "holdings_per_s": round(size / elapsed, 3),
+        "failed_holdings": sum(1 for h in holdings.values() if str(h.get("summary", "")).startswith("Processing Failed")),
+        "stages": stage_latencies(get_tracer().events()),
+        "model_usage": config.get("model_usage", {}).get("totals", {}),
+        "model_usage_by_stage": config.get("model_usage", {}).get("by_stage", {}),
+        "search_cache": config.get("search_cache", {}),
+        "lambda": config.get("lambda", {}),
+        "peak_traced_mb": round(peak_bytes / 2**20, 2) if peak_bytes is not None else None,
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 2)
+    }
+
+
+def print_report(result: Dict[str, Any], top: int = 12):
+    print(f"\n=== {result['size']} holdings: {result['wall_s']}s, {result['holdings_per_s']} holdings/s, "
+          f"{result['failed_holdings']} failed ===")
+    usage = result["model_usage"]
+    if usage:
+        print(f"  Bedrock: {usage.get('calls')} calls, {usage.get('input_tokens')} in / "
+              f"{usage.get('output_tokens')} out tokens, ${usage.get('cost_usd')}")
+    print(f"  Memory: peak traced {result['peak_traced_mb']} MB, max RSS {result['max_rss_mb']} MB")
+    print(f"  {'stage':<22}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'total s':>10}")
+    stages = sorted(result["stages"].items(), key=lambda kv: kv[1]["total_ms"], reverse=True)
+    for name, s in stages[:top]:
+        print(f"  {name:<22}{s['count']:>7}{s['p50_ms']:>10}{s['p95_ms']:>10}{s['p99_ms']:>10}"
+              f"{s['total_ms'] / 1000:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--workers", type=int, default=int(os.getenv("SCOUT_MAX_WORKERS", "8")))
+    parser.add_argument("--backend", default="numpy", choices=["numpy", "chroma"])
+    parser.add_argument("--results-per-query", type=int, default=10)
+    parser.add_argument("--latency", action="append", default=[], metavar="SERVICE=SPEC",
+                        help="Override a service latency, e.g. bedrock=lognormal:800:0.4 or serp=fixed:0. "
+                             "Services: serp, bedrock, embedding, s3, yf_info, yf_download.")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Multiplies every injected delay.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-tracemalloc", action="store_true", help="Skip peak traced memory (it slows the run).")
+    parser.add_argument("--results", default=RESULTS_PATH, help="JSONL file results are appended to.")
+    parser.add_argument("--label", default="", help="Free-form tag stored with the results.")
+    parser.add_argument("--verbose", action="store_true", help="Show the pipeline's own output.")
+    args = parser.parse_args()
+
+    overrides = dict(spec.split("=", 1) for spec in args.latency)
+    scratch = tempfile.mkdtemp(prefix="sentinel_bench_")
+    _configure_environment(scratch, args.backend)
+
+    from .fakes import build_latencies
+    latencies = build_latencies(overrides, seed=args.seed, scale=args.latency_scale)
+    handler, _, _ = _install_fakes(latencies, args.results_per_query, scratch)
+
+    run = {
+        "timestamp": datetime.now().isoformat(),
+        "commit": _git_commit(),
+        "label": args.label,
+        "python": sys.version.split()[0],
+        "workers": args.workers,
+        "backend": args.backend,
+        "results_per_query": args.results_per_query,
+        "latencies": {name: model.spec for name, model in latencies.items()},
+        "latency_scale": args.latency_scale,
+        "seed": args.seed
+    }
+    print(f"Benchmarking sizes {args.sizes} with {args.workers} worker(s), scratch dir {scratch}")
+
+    os.makedirs(os.path.dirname(args.results) or ".", exist_ok=True)
+    for size in args.sizes:
+        result = run_size(handler, size, args.workers, not args.no_tracemalloc, args.verbose)
+        print_report(result)
+        with open(args.results, "a") as f:
+            f.write(json.dumps({**run, **result}) + "\n")
+
+    print(f"\nAppended {len(args.sizes)} result(s) to {args.results}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,13 @@
 import streamlit as st
+import gzip
+import hashlib
 import json
+import mmap
 import os
-from datetime import datetime
+import sys
+from collections import ChainMap
+from collections.abc import Mapping
+from datetime import datetime, timedelta
 
 # Page Config
 st.set_page_config(
@@ -10,14 +16,257 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Load Data
-DATA_PATH = os.path.join("data", "scout_latest.json")
+# Snapshot helpers are shared with the Scout's writer. Streamlit puts only
+# this file's directory on sys.path, so the repository root is added here.
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
+from src.infrastructure.output_format import (COMPACT_FORMAT, INDEX_FORMAT, event_score, holding_digest,
+                                             expand as expand_compact)
+from src.infrastructure.run_journal import read_journal
+
+# Load Data. streamlit_demo/app.py runs this dashboard over its own data
+# directory through SENTINEL_DASHBOARD_DATA_DIR.
+DATA_DIR = os.getenv("SENTINEL_DASHBOARD_DATA_DIR", "data")
+DATA_PATH = os.path.join(DATA_DIR, "scout_latest.json")
+
+# Parsed snapshots are cached per (path, mtime, size), so an unchanged file
+# is never read or parsed again, and shared across sessions rather than
+# copied (callers must not mutate them). orjson is used when installed.
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+# "1" memory-maps compact snapshots that have an index sidecar (written by
+# the Scout) and decodes each holding only when it is first shown; "auto"
+# does so for snapshots of at least LAZY_MIN_BYTES; "0" always parses eagerly.
+SNAPSHOT_LAZY = os.getenv("SENTINEL_DASHBOARD_LAZY", "auto")
+LAZY_MIN_BYTES = 4 * 2**20
+
+class LazyHoldings(Mapping):
+    """Holdings of a memory-mapped compact snapshot, each decoded on first access."""
+
+    def __init__(self, buf, index):
+        self._buf = buf
+        self._index = index["holdings"]
+        self._table_span = index.get("archetype_performance")
+        self._table = None
+        self._decoded = {}
+
+    def __getitem__(self, symbol):
+        if symbol not in self._decoded:
+            start, end = self._index[symbol]["span"]
+            holding = _loads(self._buf[start:end])
+            for ctx in holding.get("historical_context", []):
+                if "performance_ref" in ctx:
+                    ctx["performance"] = self.table().get(ctx.pop("performance_ref"),
+                                                          {"error": "Missing performance entry"})
+            self._decoded[symbol] = holding
+        return self._decoded[symbol]
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+    def table(self):
+        if self._table is None:
+            self._table = _loads(self._buf[slice(*self._table_span)]) if self._table_span else {}
+        return self._table
+
+    def digest(self, symbol):
+        """Verdict, confidence, event count etc. from the index, without decoding the holding."""
+        return self._index.get(symbol, {}).get("digest")
+
+def _load_lazy(path, size):
+    try:
+        with open(path + ".idx", "rb") as f:
+            index = _loads(f.read())
+    except (OSError, ValueError):
+        return None
+    # The index is written after the snapshot; make sure it describes this one
+    if index.get("format") != INDEX_FORMAT or index.get("size") != size:
+        return None
+    with open(path, "rb") as f:
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    head = buf[:4096]
+    expected = [b'"format":' + json.dumps(COMPACT_FORMAT).encode(),
+                b'"timestamp":' + json.dumps(index.get("timestamp")).encode()]
+    if not all(marker in head for marker in expected):
+        buf.close()
+        return None
+    return {"format": COMPACT_FORMAT, "timestamp": index.get("timestamp"),
+            "data": {"holdings": LazyHoldings(buf, index)}}
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _load_snapshot(path, mtime_ns, size, lazy):
+    if lazy:
+        doc = _load_lazy(path, size)
+        if doc is not None:
+            return doc
+    with open(path, "rb") as f:
+        raw = f.read()
+    if raw[:2] == b"\x1f\x8b":
+        raw = gzip.decompress(raw)
+    return expand_compact(_loads(raw))
 
 def load_data():
-    if not os.path.exists(DATA_PATH):
+    # The Scout writes scout_latest.json, or scout_latest.json.gz in compact.gz mode; use the newer one
+    candidates = [p for p in (DATA_PATH, DATA_PATH + ".gz") if os.path.exists(p)]
+    if not candidates:
         return None
-    with open(DATA_PATH, "r") as f:
-        return json.load(f)
+    path = max(candidates, key=os.path.getmtime)
+    stat = os.stat(path)
+    lazy = SNAPSHOT_LAZY == "1" or (SNAPSHOT_LAZY == "auto" and stat.st_size >= LAZY_MIN_BYTES)
+    return _load_snapshot(path, stat.st_mtime_ns, stat.st_size, lazy)
+
+# Partial Advisor reports of a Scout run still in progress (src/infrastructure/live_results.py)
+LIVE_PATH = os.path.join(DATA_DIR, "scout_live.json")
+# A run whose live file or journal has not changed for this long (the Lambda
+# timeout) has died without finishing
+RUN_STALE_SECONDS = 15 * 60
+# Fields shown only once they have finished streaming; a half-received
+# verdict ("Crit") would otherwise be shown, and coloured, as if final
+FINAL_ONLY_FIELDS = ("verdict", "confidence")
+
+def load_live():
+    if not os.path.exists(LIVE_PATH):
+        return {}
+    try:
+        with open(LIVE_PATH, "r") as f:
+            live = json.load(f)
+        stale = datetime.now().timestamp() - os.path.getmtime(LIVE_PATH) > RUN_STALE_SECONDS
+    except (OSError, ValueError):
+        # Mid-write or malformed; the next refresh will pick it up
+        return {}
+    if live.get("status") == "running" and stale:
+        # The run died: keep the finished verdicts, drop the half-written ones
+        live["status"] = "stopped"
+        live["holdings"] = {s: h for s, h in live.get("holdings", {}).items() if h.get("status") == "complete"}
+    return live
+
+def live_report(entry):
+    """A live entry's report, without verdict/confidence until they have finished streaming."""
+    report = entry.get("report") or {}
+    if entry.get("status") == "complete":
+        return report
+    complete = set(entry.get("complete_fields", []))
+    return {k: v for k, v in report.items() if k not in FINAL_ONLY_FIELDS or k in complete}
+
+# Price history for the charts: one bulk yfinance download covering every
+# holding, keyed by ticker set and trading day and cached in memory
+# (st.cache_data) and on disk, so reruns never hit the network. Only a
+# download that has every ticker is written to disk; the in-memory entry
+# expires after PRICE_RETRY_SECONDS, so a failed or partial download is
+# retried (a complete one is then just re-read from disk). Tickers the
+# download misses fall back to the prices_{ticker}.json files written by
+# streamlit_demo/cache_data.py. With SENTINEL_DASHBOARD_PRICE_DOWNLOAD=0 (set
+# by the offline demo) only those files are used and nothing is written.
+PRICE_PERIOD = "6mo"
+PRICE_DOWNLOAD = os.getenv("SENTINEL_DASHBOARD_PRICE_DOWNLOAD", "1") == "1"
+PRICE_RETRY_SECONDS = 10 * 60
+PRICE_FILES_DIR = DATA_DIR
+PRICE_CACHE_DIR = os.path.join(DATA_DIR, "dashboard_prices")
+
+def trading_day():
+    # Weekend reruns reuse Friday's prices
+    today = datetime.now().date()
+    return (today - timedelta(days=max(0, today.weekday() - 4))).isoformat()
+
+def _read_price_file(ticker):
+    path = os.path.join(PRICE_FILES_DIR, f"prices_{ticker}.json")
+    if not os.path.exists(path):
+        return None
+    import pandas as pd
+    with open(path, "r") as f:
+        records = json.load(f)
+    if not records:
+        return None
+    frame = pd.DataFrame(records)
+    return pd.Series(frame["Price"].values, index=pd.to_datetime(frame["Date"]), name=ticker)
+
+def _download_prices(tickers):
+    import pandas as pd
+    try:
+        import yfinance as yf
+    except ImportError:
+        return pd.DataFrame()
+    df = yf.download(list(tickers), period=PRICE_PERIOD, interval="1d", progress=False)
+    if df.empty:
+        return pd.DataFrame()
+    close = df["Close"]
+    # A single ticker may come back as a plain Series, depending on the yfinance version
+    if isinstance(close, pd.Series):
+        close = close.to_frame(tickers[0])
+    return close.dropna(axis=1, how="all")
+
+@st.cache_data(show_spinner=False, max_entries=16, ttl=PRICE_RETRY_SECONDS)
+def load_prices(tickers, day):
+    """Closing prices for tickers (a sorted tuple) on trading day, one column per ticker."""
+    import pandas as pd
+    key = hashlib.sha1(",".join(tickers).encode("utf-8")).hexdigest()[:16]
+    cache_path = os.path.join(PRICE_CACHE_DIR, f"{day}_{key}.csv")
+    prices = pd.DataFrame()
+    if PRICE_DOWNLOAD and os.path.exists(cache_path):
+        prices = pd.read_csv(cache_path, index_col=0, parse_dates=True)
+    elif PRICE_DOWNLOAD:
+        try:
+            prices = _download_prices(tickers)
+        except Exception as e:
+            print(f"Bulk price download failed: {e}")
+        missing = [t for t in tickers if t not in prices.columns]
+        if missing or prices.empty:
+            print(f"Bulk price download missed {', '.join(missing)}; not caching it")
+        else:
+            try:
+                os.makedirs(PRICE_CACHE_DIR, exist_ok=True)
+                for old in os.listdir(PRICE_CACHE_DIR):
+                    if not old.startswith(day):
+                        os.remove(os.path.join(PRICE_CACHE_DIR, old))
+                tmp = cache_path + ".tmp"
+                prices.to_csv(tmp)
+                os.replace(tmp, cache_path)
+            except OSError as e:
+                print(f"Could not cache prices: {e}")
+    fallback = [_read_price_file(t) for t in tickers if t not in prices.columns]
+    fallback = [series for series in fallback if series is not None]
+    if fallback:
+        prices = pd.concat([prices, *fallback], axis=1)
+    return prices
+
+# Per-holding results of the newest Scout run, appended as each holding
+# finishes (src/infrastructure/run_journal.py). current.json names the run.
+RUNS_DIR = os.path.join(DATA_DIR, "runs")
+
+def load_run_journal():
+    try:
+        with open(os.path.join(RUNS_DIR, "current.json"), "r") as f:
+            pointer = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if pointer.get("status") != "running":
+        return {}
+    path = os.path.join(RUNS_DIR, os.path.basename(pointer.get("path", "")))
+    if not os.path.exists(path):
+        return {}
+    # Tail the journal: only lines added since the last rerun are parsed
+    tail = st.session_state.get("run_journal")
+    if not tail or tail["path"] != path:
+        tail = {"path": path, "offset": 0, "run_id": pointer.get("run_id"), "started": "", "expected": [],
+                "holdings": {}}
+        st.session_state["run_journal"] = tail
+    records, tail["offset"] = read_journal(path, tail["offset"])
+    for record in records:
+        if record.get("type") == "run_start":
+            tail["started"] = record.get("timestamp", "")
+            tail["expected"] = record.get("symbols", [])
+        elif record.get("type") == "holding":
+            tail["holdings"][record["symbol"]] = record["result"]
+    tail["stale"] = datetime.now().timestamp() - os.path.getmtime(path) > RUN_STALE_SECONDS
+    return tail
 
 raw_data = load_data()
 
@@ -34,6 +283,21 @@ if raw_data:
         st.error("Data format outdated. Please run the Scout agent.")
         st.stop()
 
+# Holdings the run in progress has already finished replace the last snapshot's
+run_journal = load_run_journal()
+if raw_data and run_journal.get("started", "") <= (timestamp or ""):
+    run_journal = {}
+snapshot_holdings = data_payload.get("holdings", {})
+if run_journal.get("holdings"):
+    # A ChainMap keeps a lazily loaded snapshot lazy
+    data_payload = {**data_payload, "holdings": ChainMap(run_journal["holdings"], snapshot_holdings)}
+
+# A live file older than the loaded snapshot belongs to a run that already finished
+live_data = load_live()
+if raw_data and live_data.get("run_started", "") <= (timestamp or ""):
+    live_data = {}
+live_holdings = live_data.get("holdings", {})
+
 # Sidebar
 with st.sidebar:
     st.header("Risk Navigator")
@@ -49,6 +313,28 @@ with st.sidebar:
     else:
         st.caption("No holdings detected.")
 
+    if run_journal:
+        st.divider()
+        saved = f"{len(run_journal['holdings'])}/{len(run_journal['expected'])} holdings saved"
+        if run_journal["stale"]:
+            st.error(f"Run {run_journal['run_id']} stopped early: {saved}. Consolidate it with "
+                     f"`python -m src.infrastructure.run_journal data/runs/{run_journal['run_id']}.jsonl`")
+        else:
+            st.caption(f"Run {run_journal['run_id']}: {saved}")
+
+    if live_data.get("status") == "running":
+        st.divider()
+        expected = live_data.get("expected", [])
+        done = sum(1 for h in live_holdings.values() if h.get("status") == "complete")
+        st.warning(f"Scan in progress: {done}/{len(expected)} verdicts in")
+        for symbol, entry in live_holdings.items():
+            verdict = live_report(entry).get("verdict")
+            if verdict:
+                st.caption(f"{symbol}: {verdict}")
+    elif live_data.get("status") == "stopped":
+        st.divider()
+        st.error(f"Scan started {live_data.get('run_started')} stopped updating before it finished.")
+
     st.divider()
     if st.button("Refresh Data"):
         st.rerun()
@@ -57,145 +343,217 @@ with st.sidebar:
 current_date = datetime.now().strftime("%Y-%m-%d")
 st.title(f"The Sentinel's Weekly Briefing ({current_date})")
 
-if not data_payload or not data_payload.get("holdings"):
+if not data_payload.get("holdings") and not live_holdings:
     st.warning("No Scan Data Found. Run the 'Scout' agent first.")
     st.stop()
 
-# TABS for each company
-tickers = list(data_payload["holdings"].keys())
-tabs = st.tabs(tickers)
+tickers = list(data_payload.get("holdings", {}).keys())
+tickers += [t for t in live_holdings if t not in tickers]
+
+# One cached lookup for the whole portfolio; each holding just slices its column
+try:
+    prices = load_prices(tuple(sorted(tickers)), trading_day())
+except Exception as e:
+    st.warning(f"Could not load prices: {e}")
+    prices = None
+
+# Tabs build every holding's page on every rerun, even though only one is
+# visible. Past a handful of holdings the default layout is a summary table
+# plus the one holding picked from it, so a rerun only renders what is shown.
+TABS_MAX_HOLDINGS = 8
+NEWS_PAGE_SIZE = 10
+
+def ticker_digest(ticker):
+    """Overview fields of a holding; a lazily loaded snapshot answers from its index without decoding."""
+    if ticker not in run_journal.get("holdings", {}) and isinstance(snapshot_holdings, LazyHoldings):
+        digest = snapshot_holdings.digest(ticker)
+        if digest is not None:
+            return digest
+    company_data = data_payload.get("holdings", {}).get(ticker)
+    return holding_digest(company_data) if company_data is not None else None
+
+def holding_status(ticker, digest):
+    live_entry = live_holdings.get(ticker)
+    if live_entry and live_entry.get("status") != "complete":
+        return "Streaming"
+    if digest is None:
+        return "Assessed" if live_entry else "Pending"
+    if digest["failed"]:
+        return "Failed"
+    return "Carried forward" if digest["recomputed"] is False else "Updated"
+
+def as_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def portfolio_summary():
+    rows = []
+    for ticker in tickers:
+        digest = ticker_digest(ticker)
+        live_entry = live_holdings.get(ticker)
+        report = live_report(live_entry) if live_entry else digest or {}
+        rows.append({
+            "Ticker": ticker,
+            "Verdict": str(report.get("verdict") or ("Pending..." if live_entry else "")),
+            "Confidence": as_int(report.get("confidence")),
+            "Events": digest["events"] if digest else 0,
+            "Top Relevance": digest["top_relevance"] if digest else None,
+            "Status": holding_status(ticker, digest)
+        })
+    return rows
+
+def render_holding(ticker):
+    company_data = data_payload.get("holdings", {}).get(ticker, {})
+
+    # 0. Live Chart (The Situation Now)
+    if prices is not None and ticker in prices.columns:
+        st.caption("**Everything that happened since the last briefing, summarized:**")
+        st.line_chart(prices[ticker].dropna(), color="#00FF00") # Green for current
+    elif prices is not None:
+        st.warning(f"Price data not found for {ticker}")
+
+    summary_text = company_data.get("summary", "No summary available.")
+    # Sanitize text to remove markdown code ticks that cause font mismatches
+    summary_text = summary_text.replace("`", "")
+    st.info(summary_text) 
+
+    # 1.5 Historical Context (The Historian)
+    hist_contexts = company_data.get("historical_context") 
+
+    if hist_contexts and isinstance(hist_contexts, list) and len(hist_contexts) > 0:
+        st.markdown("### Historical Parallels (Top 3 Matches)")
+
+        # Create tabs for the matches
+        match_names = [ctx['archetype']['name'].split("(")[0].strip() for ctx in hist_contexts]
+        # Handle potential duplicate names
+        match_names = [f"{name} ({ctx['archetype']['ticker']})" for name, ctx in zip(match_names, hist_contexts)]
+
+        hist_tabs = st.tabs(match_names)
+
+        for idx, ctx in enumerate(hist_contexts):
+            with hist_tabs[idx]:
+                archetype = ctx.get("archetype", {})
+                perf = ctx.get("performance", {})
+
+                with st.container(border=True):
+                    col_h1, col_h2 = st.columns([2, 1])
+                    with col_h1:
+                        st.markdown(f"**Archetype:** {archetype.get('name')}")
+                        st.caption(f"Semantic Distance: {archetype.get('distance'):.4f}")
+                        st.write(f"*{archetype.get('historical_summary')}*")
+                    with col_h2:
+                        if "error" in perf:
+                            st.error(f"Data Error: {perf.get('error')}")
+                        else:
+                            ret = perf.get('total_return_pct')
+                            dd = perf.get('max_drawdown_pct')
+                            st.metric("Historical Return", f"{ret}%", delta=f"{ret}%")
+                            st.metric("Max Drawdown", f"{dd}%", delta=f"{dd}%")
+
+                # Chart the historical drawdown
+                # (list of rows in the legacy format, columnar dict in the compact one)
+                ts_data = perf.get("timeseries", [])
+                if ts_data:
+                    import pandas as pd
+                    df_hist = pd.DataFrame(ts_data)
+                    df_hist['date'] = pd.to_datetime(df_hist['date'])
+                    df_hist = df_hist.set_index('date')
 
-for i, ticker in enumerate(tickers):
-    with tabs[i]:
-        company_data = data_payload["holdings"][ticker]
-        
-        
+                    # Chart name
+                    ticker_label = archetype.get('ticker') or archetype.get('id')
+                    st.caption(f"**The Ghost of Risk Past**: {ticker_label} Price Action (Normalized to 100)")
+                    st.line_chart(df_hist['normalized'], color="#FF4B4B")  # Red for risk
 
 
-        # 0. Live Chart (The Situation Now)
+    st.divider()
+
+    # 2. Ranked Event Feed
+    st.subheader(f"{ticker} News Feed, Listed by Relevance")
+
+    events = sorted(company_data.get("events", []), key=event_score, reverse=True)
+    if not events:
+        st.write("No significant events detected.")
+    else:
+        pages = (len(events) + NEWS_PAGE_SIZE - 1) // NEWS_PAGE_SIZE
+        page = 1
+        if pages > 1:
+            page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1,
+                                   key=f"{ticker}_news_page")
+        for event in events[(page - 1) * NEWS_PAGE_SIZE:page * NEWS_PAGE_SIZE]:
+            reason = event.get('reason', '').replace("`", "")
+            title = event.get('title', '').replace("`", "")
+            snippet = event.get('snippet', 'No snippet').replace("`", "")
+
+            # Default expander, no score prefix
+            with st.expander(f"{title}", expanded=False):
+                col_a, col_b = st.columns([3, 1])
+                with col_a:
+                    st.markdown(f"**Snippet:** {snippet}")
+                    # Hide "Why this matters" if irrelevant/unavailable
+                    if reason and "LLM unavailable" not in reason:
+                        st.caption(f"**Why this matters:** {reason}")
+                with col_b:
+                    st.caption(f"Source: {event.get('source', 'Unknown')}")
+                    st.caption(f"Date: {event.get('published_date', 'Unknown')}")
+                    st.markdown(f"[Read Article]({event.get('url')})")
+
+    st.divider()
+
+    # 4. Strategic Risk Assessment (The Advisor - Phase 4)
+    advisor_report = company_data.get("advisor_report", {})
+    live_entry = live_holdings.get(ticker)
+    streaming = False
+    if live_entry:
+        # The live run's report supersedes the last snapshot, even partially
+        advisor_report = live_report(live_entry)
+        streaming = live_entry.get("status") != "complete"
+    if advisor_report or streaming:
+        verdict = advisor_report.get("verdict", "Pending..." if streaming else "Neutral")
         try:
-            import yfinance as yf
-            import pandas as pd
-            # Fetch last 6 months
-            st.caption("**Everything that happened since the last briefing, summarized:**")
-            df_curr = yf.download(ticker, period="6m", interval="1d", progress=False)
-            if not df_curr.empty:
-                # Handle MultiIndex if present
-                if isinstance(df_curr.columns, pd.MultiIndex):
-                    # yfinance returns (Price, Ticker) levels sometimes
-                    try:
-                        df_curr = df_curr['Close']
-                    except:
-                        df_curr = df_curr.iloc[:, 0] # Fallback to first column
-                elif 'Close' in df_curr.columns:
-                     df_curr = df_curr['Close']
-                
-                st.line_chart(df_curr, color="#00FF00") # Green for current
-        except Exception as e:
-            st.warning(f"Could not load live chart: {e}")
-
-
-        summary_text = company_data.get("summary", "No summary available.")
-        # Sanitize text to remove markdown code ticks that cause font mismatches
-        summary_text = summary_text.replace("`", "")
-        st.info(summary_text) 
-        
-        # 1.5 Historical Context (The Historian)
-        hist_contexts = company_data.get("historical_context") 
-        
-        if hist_contexts and isinstance(hist_contexts, list) and len(hist_contexts) > 0:
-            st.markdown("### Historical Parallels (Top 3 Matches)")
-            
-            # Create tabs for the matches
-            match_names = [ctx['archetype']['name'].split("(")[0].strip() for ctx in hist_contexts]
-            # Handle potential duplicate names
-            match_names = [f"{name} ({ctx['archetype']['ticker']})" for name, ctx in zip(match_names, hist_contexts)]
-            
-            hist_tabs = st.tabs(match_names)
-            
-            for idx, ctx in enumerate(hist_contexts):
-                with hist_tabs[idx]:
-                    archetype = ctx.get("archetype", {})
-                    perf = ctx.get("performance", {})
-                    
-                    with st.container(border=True):
-                        col_h1, col_h2 = st.columns([2, 1])
-                        with col_h1:
-                            st.markdown(f"**Archetype:** {archetype.get('name')}")
-                            st.caption(f"Semantic Distance: {archetype.get('distance'):.4f}")
-                            st.write(f"*{archetype.get('historical_summary')}*")
-                        with col_h2:
-                            if "error" in perf:
-                                st.error(f"Data Error: {perf.get('error')}")
-                            else:
-                                ret = perf.get('total_return_pct')
-                                dd = perf.get('max_drawdown_pct')
-                                st.metric("Historical Return", f"{ret}%", delta=f"{ret}%")
-                                st.metric("Max Drawdown", f"{dd}%", delta=f"{dd}%")
-                    
-                    # Chart the historical drawdown
-                    ts_data = perf.get("timeseries", [])
-                    if ts_data:
-                        import pandas as pd
-                        df_hist = pd.DataFrame(ts_data)
-                        df_hist['date'] = pd.to_datetime(df_hist['date'])
-                        df_hist = df_hist.set_index('date')
-                        
-                        # Chart name
-                        ticker_label = archetype.get('ticker') or archetype.get('id')
-                        st.caption(f"**The Ghost of Risk Past**: {ticker_label} Price Action (Normalized to 100)")
-                        st.line_chart(df_hist['normalized'], color="#FF4B4B")  # Red for risk
-
-        
-        st.divider()
-        
-        # 2. Ranked Event Feed
-        st.subheader(f"{ticker} News Feed, Listed by Relevance")
-        
-        events = company_data.get("events", [])
-        if not events:
-            st.write("No significant events detected.")
+            confidence = int(advisor_report.get("confidence", 0))
+        except (TypeError, ValueError):
+            confidence = 0
+        if streaming:
+            st.caption("The Advisor is still writing this assessment. Refresh for more.")
+
+        # Color logic
+        if "verdict" not in advisor_report and streaming:
+            v_color = "gray"
         else:
-            for event in events:
-                reason = event.get('reason', '').replace("`", "")
-                title = event.get('title', '').replace("`", "")
-                snippet = event.get('snippet', 'No snippet').replace("`", "")
-                
-                # Default expander, no score prefix
-                with st.expander(f"{title}", expanded=False):
-                    col_a, col_b = st.columns([3, 1])
-                    with col_a:
-                        st.markdown(f"**Snippet:** {snippet}")
-                        # Hide "Why this matters" if irrelevant/unavailable
-                        if reason and "LLM unavailable" not in reason:
-                            st.caption(f"**Why this matters:** {reason}")
-                    with col_b:
-                        st.caption(f"Source: {event.get('source', 'Unknown')}")
-                        st.caption(f"Date: {event.get('published_date', 'Unknown')}")
-                        st.markdown(f"[Read Article]({event.get('url')})")
+            v_color = "red" if "Critical" in verdict else "orange" if "Elevated" in verdict or "High" in verdict else "green"
 
-        st.divider()
+        st.markdown(f"### Strategic Risk Assessment: :{v_color}[{verdict}]")
+        st.progress(confidence, text=f"Confidence Score: {confidence}%")
 
-        # 4. Strategic Risk Assessment (The Advisor - Phase 4)
-        advisor_report = company_data.get("advisor_report", {})
-        if advisor_report:
-            verdict = advisor_report.get("verdict", "Neutral")
-            confidence = advisor_report.get("confidence", 0)
-            
-            # Color logic
-            v_color = "red" if "Critical" in verdict else "orange" if "Elevated" in verdict or "High" in verdict else "green"
-            
-            st.markdown(f"### Strategic Risk Assessment: :{v_color}[{verdict}]")
-            st.progress(confidence, text=f"Confidence Score: {confidence}%")
-            
-            st.info(f"**Synthesis:** {advisor_report.get('synthesis')}")
-            
-            with st.expander("Recommended Action Plan", expanded=True):
-                for action in advisor_report.get("action_plan", []):
-                    st.checkbox(action, key=f"{ticker}_{action}")
+        st.info(f"**Synthesis:** {advisor_report.get('synthesis', '')}")
 
+        with st.expander("Recommended Action Plan", expanded=True):
+            for action in advisor_report.get("action_plan", []):
+                st.checkbox(action, key=f"{ticker}_{action}")
 
 
+with st.sidebar:
+    st.divider()
+    layout = st.radio(
+        "Layout",
+        ["Overview", "Tabs"],
+        index=0 if len(tickers) > TABS_MAX_HOLDINGS else 1,
+        help="Overview renders only the selected holding; Tabs renders every holding on each refresh."
+    )
+
+if layout == "Tabs":
+    tabs = st.tabs(tickers)
+    for i, ticker in enumerate(tickers):
+        with tabs[i]:
+            render_holding(ticker)
+else:
+    st.subheader("Portfolio Overview")
+    st.dataframe(portfolio_summary(), hide_index=True, use_container_width=True)
+    selected = st.selectbox("Holding", tickers, key="selected_ticker")
+    st.divider()
+    render_holding(selected)
 
 st.divider()
 st.caption("Agentic Portfolio Risk Mitigation System | Powered by LPL Financial & Google SerpApi")
@@ -0,0 +1,82 @@
+"""
+Recall/latency comparison of the Historian backends.
+
+Builds a VectorEngine on each backend, runs the same batch of archetype-style
+queries through both, and reports startup time, query latency and how often
+the NumPy index returns the same top-k ids as Chroma.
+
+Embeddings come from the shared embedding cache, so after the first run this
+makes no Bedrock calls.
+
+Usage:
+    python -m src.historian.compare_backends --k 3 --repeats 20
+"""
+import argparse
+import statistics
+import time
+from typing import List
+
+from .archetypes import get_archetypes
+from .engine import VectorEngine
+
+
+def build_queries() -> List[str]:
+    """Queries phrased like Scout summaries rather than archetype documents."""
+    queries = []
+    for arch in get_archetypes():
+        queries.append(arch["typical_impact"])
+        queries.append(arch["summary"].split(".")[0])
+    return queries
+
+
+def time_backend(backend: str, query_embs: List[List[float]], k: int, repeats: int):
+    start = time.perf_counter()
+    engine = VectorEngine(backend=backend)
+    startup_ms = (time.perf_counter() - start) * 1000
+
+    latencies = []
+    results = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        results = engine.collection.query(query_embeddings=query_embs, n_results=k)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return engine, startup_ms, latencies, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    queries = build_queries()
+    # Embed once up front so both backends are timed on search alone.
+    query_embs = VectorEngine(backend="numpy")._embed_many(queries)
+
+    report = {}
+    for backend in ("chroma", "numpy"):
+        _, startup_ms, latencies, results = time_backend(backend, query_embs, args.k, args.repeats)
+        report[backend] = {
+            "startup_ms": startup_ms,
+            "median_ms": statistics.median(latencies),
+            "p95_ms": sorted(latencies)[int(0.95 * (len(latencies) - 1))],
+            "ids": results["ids"]
+        }
+
+    overlaps = [
+        len(set(c) & set(n)) / max(len(c), 1)
+        for c, n in zip(report["chroma"]["ids"], report["numpy"]["ids"])
+    ]
+    top1 = [c[:1] == n[:1] for c, n in zip(report["chroma"]["ids"], report["numpy"]["ids"])]
+
+    print(f"{len(queries)} queries, k={args.k}, {args.repeats} repeats (batch latency)\n")
+    print(f"{'backend':<8} {'startup ms':>11} {'median ms':>10} {'p95 ms':>8}")
+    for backend in ("chroma", "numpy"):
+        r = report[backend]
+        print(f"{backend:<8} {r['startup_ms']:>11.1f} {r['median_ms']:>10.3f} {r['p95_ms']:>8.3f}")
+    print(f"\nrecall@{args.k} of numpy vs chroma: {statistics.mean(overlaps):.3f}")
+    print(f"top-1 agreement: {sum(top1)}/{len(top1)}")
+
+
+if __name__ == "__main__":
+    main()
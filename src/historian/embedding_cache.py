@@ -0,0 +1,73 @@
+import hashlib
+import os
+import struct
+import threading
+from array import array
+from typing import List, Optional, Dict, Any
+from src.infrastructure.cache import PersistentCache, get_cache
+
+# Embeddings are content-addressed (model id + text), so they never go stale;
+# the TTL only exists to let abandoned entries age out eventually.
+EMBEDDING_CACHE_TTL_SECONDS = int(os.getenv("EMBEDDING_CACHE_TTL_SECONDS", str(365 * 24 * 3600)))
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "50000"))
+
+# Blob layout: uint32 size of the original Bedrock response, then the vector
+# as little-endian float32 (6 KB for Titan's 1536 dims vs ~30 KB of JSON).
+_HEADER = struct.Struct("<I")
+
+
+class EmbeddingCache:
+    """
+    Persistent embedding store keyed by sha256(model_id + text).
+    Tracks hits, misses and the Bedrock response bytes that hits avoided.
+    """
+
+    def __init__(self, cache: PersistentCache):
+        self.cache = cache
+        self.bytes_saved = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(model_id: str, text: str) -> str:
+        digest = hashlib.sha256(f"{model_id}\x00{text}".encode("utf-8")).hexdigest()
+        return f"emb|{digest}"
+
+    def get(self, model_id: str, text: str) -> Optional[List[float]]:
+        blob = self.cache.get(self.make_key(model_id, text))
+        if blob is None:
+            return None
+        (response_bytes,) = _HEADER.unpack_from(blob)
+        vector = array("f")
+        vector.frombytes(blob[_HEADER.size:])
+        with self._lock:
+            self.bytes_saved += response_bytes
+        return vector.tolist()
+
+    def put(self, model_id: str, text: str, vector: List[float], response_bytes: int = 0):
+        blob = _HEADER.pack(response_bytes) + array("f", vector).tobytes()
+        self.cache.set(self.make_key(model_id, text), blob)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self.cache.stats()
+        stats["bytes_saved"] = self.bytes_saved
+        return stats
+
+    def reset_stats(self):
+        self.cache.reset_stats()
+        with self._lock:
+            self.bytes_saved = 0
+
+
+_embedding_cache: Optional[EmbeddingCache] = None
+_embedding_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Process-wide embedding cache at CACHE_DIR/embeddings.sqlite."""
+    global _embedding_cache
+    with _embedding_cache_lock:
+        if _embedding_cache is None:
+            _embedding_cache = EmbeddingCache(
+                get_cache("embeddings", EMBEDDING_CACHE_TTL_SECONDS, EMBEDDING_CACHE_MAX_ENTRIES)
+            )
+        return _embedding_cache
@@ -1,63 +1,129 @@
 import os
-import boto3
+import hashlib
 import json
-import chromadb
-from chromadb.utils import embedding_functions
-from typing import List, Dict, Any
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
 from dotenv import load_dotenv
 from .archetypes import get_archetypes
+from .embedding_cache import EmbeddingCache, get_embedding_cache
+from src.infrastructure.bedrock_gateway import get_bedrock_gateway
+from src.infrastructure.metrics import get_model_metrics, retry_attempts
+from src.infrastructure.tracing import span
 
 load_dotenv()
 
+EMBEDDING_MODEL_ID = "amazon.titan-embed-text-v1"
+# Titan takes one text per request, so batches are embedded concurrently.
+EMBEDDING_MAX_WORKERS = int(os.getenv("EMBEDDING_MAX_WORKERS", "8"))
+
+# "chroma" (persistent ChromaDB, squared L2 distance) or "numpy" (in-process
+# exact cosine search, see numpy_index.py). The numpy backend skips chromadb
+# entirely, which is most of the Historian's local startup and query cost.
+HISTORIAN_BACKEND = os.getenv("HISTORIAN_BACKEND", "chroma")
+NUMPY_INDEX_PATH = os.getenv("HISTORIAN_INDEX_PATH", "./data/archetype_index")
+NUMPY_INDEX_MMAP = os.getenv("HISTORIAN_INDEX_MMAP", "0") == "1"
+
 class VectorEngine:
-    def __init__(self, collection_name="risk_archetypes"):
-        self.bedrock = boto3.client(
-            service_name='bedrock-runtime',
-            region_name=os.getenv("AWS_DEFAULT_REGION", "us-east-1"),
-            aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-            aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-            aws_session_token=os.getenv("AWS_SESSION_TOKEN")
-        )
-        # Initialize Persistent ChromaDB
-        self.chroma_client = chromadb.PersistentClient(path="./data/chroma_db_v3")
-        self.collection = self.chroma_client.get_or_create_collection(name=collection_name)
+    def __init__(self, collection_name="risk_archetypes", embedding_cache: Optional[EmbeddingCache] = None,
+                 backend: Optional[str] = None):
+        self.embedding_cache = embedding_cache or get_embedding_cache()
+        self.backend = backend or HISTORIAN_BACKEND
+        # Credentials come from the default chain (AWS_ACCESS_KEY_ID etc. in the environment).
+        self.bedrock = get_bedrock_gateway(os.getenv("AWS_DEFAULT_REGION", "us-east-1"))
+        if self.backend == "numpy":
+            from .numpy_index import NumpyIndex
+            self.collection = NumpyIndex(path=os.path.join(NUMPY_INDEX_PATH, collection_name), mmap=NUMPY_INDEX_MMAP)
+        elif self.backend == "chroma":
+            # Initialize Persistent ChromaDB
+            import chromadb
+            self.chroma_client = chromadb.PersistentClient(path="./data/chroma_db_v3")
+            self.collection = self.chroma_client.get_or_create_collection(name=collection_name)
+        else:
+            raise ValueError(f"Unknown Historian backend: {self.backend}")
         
-        # Check if empty, if so, seed it
-        if self.collection.count() == 0:
-            self._seed_archetypes()
+        # Embed only archetypes that are new or changed since the last startup
+        self._sync_archetypes()
 
     def _get_embedding(self, text: str) -> List[float]:
         """
-        Generate embedding using Bedrock Titan.
+        Generate embedding using Bedrock Titan, served from the embedding cache when possible.
         """
+        metrics = get_model_metrics()
+        cached = self.embedding_cache.get(EMBEDDING_MODEL_ID, text)
+        if cached is not None:
+            metrics.record("titan_embedding", EMBEDDING_MODEL_ID, outcome="cache_hit")
+            return cached
+
         body = json.dumps({
             "inputText": text,
         })
+        started = time.perf_counter()
         try:
-            response = self.bedrock.invoke_model(
-                modelId="amazon.titan-embed-text-v1",
-                contentType="application/json",
-                accept="application/json",
-                body=body
-            )
-            response_body = json.loads(response.get("body").read())
-            return response_body.get("embedding")
+            with span("titan_embedding", cat="bedrock", chars=len(text)):
+                response = self.bedrock.invoke_model(
+                    modelId=EMBEDDING_MODEL_ID,
+                    contentType="application/json",
+                    accept="application/json",
+                    body=body
+                )
+            raw_body = response.get("body").read()
+            response_body = json.loads(raw_body)
+            embedding = response_body.get("embedding")
+            metrics.record("titan_embedding", EMBEDDING_MODEL_ID,
+                           input_tokens=response_body.get("inputTextTokenCount", 0),
+                           wall_ms=(time.perf_counter() - started) * 1000,
+                           retries=retry_attempts(response))
+            self.embedding_cache.put(EMBEDDING_MODEL_ID, text, embedding, response_bytes=len(raw_body))
+            return embedding
         except Exception as e:
             print(f"Error generating embedding: {e}")
+            metrics.record("titan_embedding", EMBEDDING_MODEL_ID, outcome="error",
+                           wall_ms=(time.perf_counter() - started) * 1000,
+                           retries=retry_attempts(e))
             return [0.0] * 1536 # Titan V1 is 1536 dim
 
-    def _seed_archetypes(self):
+    def _embed_many(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embeds several texts concurrently, preserving input order.
+        """
+        if len(texts) <= 1:
+            return [self._get_embedding(t) for t in texts]
+        with ThreadPoolExecutor(max_workers=min(len(texts), EMBEDDING_MAX_WORKERS)) as pool:
+            return list(pool.map(self._get_embedding, texts))
+
+    @staticmethod
+    def _archetype_hash(arch: Dict[str, Any]) -> str:
+        """
+        Content hash of an archetype entry plus the embedding model, so a
+        model change also invalidates every stored vector.
+        """
+        payload = json.dumps(arch, sort_keys=True) + EMBEDDING_MODEL_ID
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _sync_archetypes(self):
         """
-        Embed and store the seed archetypes.
+        Brings the collection in line with ARCHETYPES. Each stored entry
+        carries a content hash in its metadata; only new or changed
+        archetypes are embedded and upserted, and ids that were removed from
+        the library are deleted. An unchanged library costs no embedding calls.
         """
-        print("Seeding Vector DB with Archetypes...")
         archetypes = get_archetypes()
+        existing = self.collection.get(include=["metadatas"])
+        stored_hashes = {
+            id_: (meta or {}).get("content_hash")
+            for id_, meta in zip(existing["ids"], existing["metadatas"])
+        }
+
         ids = []
         documents = []
         metadatas = []
-        embeddings = []
         
         for arch in archetypes:
+            content_hash = self._archetype_hash(arch)
+            if stored_hashes.get(arch["id"]) == content_hash:
+                continue
+
             ids.append(arch["id"])
             # We embed the rich summary
             text = f"{arch['name']}: {arch['summary']}"
@@ -66,39 +132,71 @@ class VectorEngine:
             # Store full data in metadata for retrieval
             meta = {k: str(v) for k, v in arch.items() if k != "summary"} # Store simple types
             meta["full_summary"] = arch["summary"] # Store summary in meta too
+            meta["content_hash"] = content_hash
             metadatas.append(meta)
-            
-            emb = self._get_embedding(text)
-            embeddings.append(emb)
-            
-        self.collection.add(
-            ids=ids,
-            embeddings=embeddings,
-            metadatas=metadatas,
-            documents=documents
-        )
-        print(f"Seeded {len(ids)} archetypes.")
+
+        removed = sorted(set(stored_hashes) - {arch["id"] for arch in archetypes})
+        if removed:
+            self.collection.delete(ids=removed)
+
+        if ids:
+            print(f"Syncing Vector DB: embedding {len(ids)} new or changed archetypes...")
+            embeddings = self._embed_many(documents)
+            for meta, emb in zip(metadatas, embeddings):
+                # A failed embedding comes back as a zero vector. Leave its hash
+                # blank so the next startup retries it instead of trusting it.
+                if not any(emb):
+                    meta["content_hash"] = ""
+
+            self.collection.upsert(
+                ids=ids,
+                embeddings=embeddings,
+                metadatas=metadatas,
+                documents=documents
+            )
+
+        if ids or removed:
+            print(f"Archetype sync: {len(ids)} upserted, {len(removed)} removed.")
 
     def find_matches(self, current_summary: str, k: int = 3) -> List[Dict[str, Any]]:
         """
         Finds the top k historical archetypes.
         """
-        query_emb = self._get_embedding(current_summary)
-        
-        results = self.collection.query(
-            query_embeddings=[query_emb],
-            n_results=k
-        )
-        
-        matches = []
+        return self.find_matches_batch([current_summary], k=k)[0]
+
+    def find_matches_batch(self, summaries: List[str], k: int = 3) -> List[List[Dict[str, Any]]]:
+        """
+        Finds the top k historical archetypes for several summaries at once.
+        All summaries are embedded concurrently and answered by a single
+        multi-query lookup. Returns one match list per summary, in order.
+        """
+        if not summaries:
+            return []
+
+        query_embs = self._embed_many(summaries)
+
+        with span("vector_query", cat="historian", backend=self.backend, queries=len(summaries), k=k):
+            results = self.collection.query(
+                query_embeddings=query_embs,
+                n_results=k
+            )
+
         if not results['ids']:
-            return matches
-            
+            return [[] for _ in summaries]
+
+        return [self._parse_matches(results, q) for q in range(len(summaries))]
+
+    @staticmethod
+    def _parse_matches(results: Dict[str, Any], q: int) -> List[Dict[str, Any]]:
+        """
+        Converts the q-th query's row of a collection.query result into match dicts.
+        """
+        matches = []
         # Parse result lists (list of lists)
-        for i in range(len(results['ids'][0])):
-            match_id = results['ids'][0][i]
-            distance = results['distances'][0][i]
-            metadata = results['metadatas'][0][i]
+        for i in range(len(results['ids'][q])):
+            match_id = results['ids'][q][i]
+            distance = results['distances'][q][i]
+            metadata = results['metadatas'][q][i]
             
             matches.append({
                 "archetype_id": match_id,
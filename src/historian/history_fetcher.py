@@ -1,84 +1,155 @@
-import yfinance as yf
-import pandas as pd
-from datetime import datetime, timedelta
-from typing import Dict, Any
+import warnings
+import numpy as np
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+from .price_store import PriceStore
+from src.infrastructure.tracing import span
+
+TRADING_DAYS_PER_YEAR = 252
+
+# Horizons (in trading days from the start of the window) reported next to the
+# full-window stats. None means the whole window.
+DEFAULT_HORIZONS: Dict[str, Optional[int]] = {"1m": 21, "3m": 63, "6m": 126, "full": None}
 
 class HistoryFetcher:
-    def __init__(self):
-        pass
+    def __init__(self, price_store: Optional[PriceStore] = None):
+        # Historical prices never change, so they are read from the local
+        # store and only missing date ranges ever hit Yahoo.
+        self.price_store = price_store or PriceStore()
 
     def get_performance(self, ticker: str, period_str: str) -> Dict[str, Any]:
         """
         Fetches historical performance for a ticker during a specific period.
         period_str format: "YYYY-MM-DD_to_YYYY-MM-DD"
         """
-        try:
-            start_str, end_str = period_str.split("_to_")
-            start_date = datetime.strptime(start_str, "%Y-%m-%d")
-            end_date = datetime.strptime(end_str, "%Y-%m-%d")
-            
-            # Fetch data (buffer by a few days to ensure we get start price)
-            df = yf.download(
-                ticker, 
-                start=start_date - timedelta(days=5), 
-                end=end_date + timedelta(days=5),
-                progress=False
-            )
-            
-            if df.empty:
-                return {"error": "No data found"}
-                
-            # Filter exactly to range
-            mask = (df.index >= start_date) & (df.index <= end_date)
-            period_df = df.loc[mask]
-            
-            if period_df.empty:
-                return {"error": "No data in exact range"}
-                
-            # Calculate stats
-            # Handle MultiIndex columns if present (yfinance update)
-            adj_close = period_df['Adj Close'] if 'Adj Close' in period_df.columns else period_df['Close']
-            
-            # If multi-index (Ticker as column level), flatten or select
-            if isinstance(adj_close, pd.DataFrame):
-                 adj_close = adj_close.iloc[:, 0] # Take first column
-            
-            start_price = float(adj_close.iloc[0])
-            end_price = float(adj_close.iloc[-1])
-            min_price = float(adj_close.min())
-            
-            # Calculate Drawdown (Max decline from start)
-            # Simple definition: (Min Price during period - Start Price) / Start Price
-            # Or strict Max Drawdown (Peak to Trough). Let's use strict MDD.
-            # Calculate running max
-            rolling_max = adj_close.cummax()
-            drawdown = (adj_close - rolling_max) / rolling_max
-            max_drawdown_pct = float(drawdown.min()) * 100
-            
-            total_return_pct = ((end_price - start_price) / start_price) * 100
-            
-            # Create a normalized time series (Base 100) for easier plotting
-            # JSON serialization requires strings for dates
-            timeseries = []
-            for date, price in adj_close.items():
-                price_val = float(price)
-                norm_val = 100 * (price_val / start_price)
-                timeseries.append({
-                    "date": date.strftime("%Y-%m-%d"),
-                    "price": round(price_val, 2),
-                    "normalized": round(norm_val, 2)
-                })
-            
-            return {
-                "start_date": start_str,
-                "end_date": end_str,
-                "start_price": round(start_price, 2),
-                "end_price": round(end_price, 2),
-                "total_return_pct": round(total_return_pct, 2),
-                "max_drawdown_pct": round(max_drawdown_pct, 2),
-                "timeseries": timeseries
-            }
-            
-        except Exception as e:
-            print(f"Error fetching history for {ticker}: {e}")
-            return {"error": str(e)}
+        return self.get_performance_batch([(ticker, period_str)])[0]
+
+    def _load_window(self, ticker: str, period_str: str) -> Tuple[np.ndarray, np.ndarray]:
+        start_str, end_str = period_str.split("_to_")
+        start_date = datetime.strptime(start_str, "%Y-%m-%d")
+        end_date = datetime.strptime(end_str, "%Y-%m-%d")
+
+        dates, prices = self.price_store.get_slice(ticker, start_date.date(), end_date.date())
+        if prices.size == 0:
+            if self.price_store.count(ticker) == 0:
+                raise LookupError("No data found")
+            raise LookupError("No data in exact range")
+        return dates, prices
+
+    def get_performance_batch(self, requests: List[Tuple[str, str]],
+                              horizons: Dict[str, Optional[int]] = DEFAULT_HORIZONS) -> List[Dict[str, Any]]:
+        """
+        Computes performance for many (ticker, period_str) windows at once.
+
+        All windows are stacked into one NaN-padded price matrix, so return,
+        max drawdown, drawdown duration, volatility and time-to-trough are
+        computed for every window and horizon with whole-array operations.
+        Returns one dict per request, in order, with the same fields as
+        get_performance plus the extra stats and a "horizons" breakdown.
+        Identical requests share one result; failed windows get {"error": ...}.
+        """
+        requests = [tuple(r) for r in requests]
+        unique = list(dict.fromkeys(requests))
+        results: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        windows = []
+
+        for ticker, period_str in unique:
+            try:
+                with span("price_fetch", cat="historian", ticker=ticker, period=period_str):
+                    dates, prices = self._load_window(ticker, period_str)
+                windows.append(((ticker, period_str), dates, prices))
+            except LookupError as e:
+                results[(ticker, period_str)] = {"error": str(e)}
+            except Exception as e:
+                print(f"Error fetching history for {ticker}: {e}")
+                results[(ticker, period_str)] = {"error": str(e)}
+
+        if windows:
+            lengths = np.array([len(p) for _, _, p in windows])
+            matrix = np.full((len(windows), lengths.max()), np.nan)
+            for row, (_, _, prices) in enumerate(windows):
+                matrix[row, :len(prices)] = prices
+
+            with span("performance_stats", cat="historian", windows=len(windows)):
+                full = self._window_stats(matrix, lengths, None)
+                stats = {
+                    label: full if horizon is None else self._window_stats(matrix, lengths, horizon)
+                    for label, horizon in horizons.items()
+                }
+
+            for row, (key, dates, prices) in enumerate(windows):
+                start_str, end_str = key[1].split("_to_")
+                start_price = float(prices[0])
+                results[key] = {
+                    "start_date": start_str,
+                    "end_date": end_str,
+                    "start_price": round(start_price, 2),
+                    "end_price": round(float(prices[-1]), 2),
+                    "total_return_pct": full["total_return_pct"][row],
+                    "max_drawdown_pct": full["max_drawdown_pct"][row],
+                    "max_drawdown_duration_days": full["max_drawdown_duration_days"][row],
+                    "time_to_trough_days": full["time_to_trough_days"][row],
+                    "volatility_pct": full["volatility_pct"][row],
+                    "horizons": {
+                        label: {name: values[row] for name, values in horizon_stats.items()}
+                        for label, horizon_stats in stats.items()
+                        if horizons[label] is None or horizons[label] <= lengths[row]
+                    },
+                    "timeseries": self._timeseries(dates, prices, start_price)
+                }
+
+        return [results[key] for key in requests]
+
+    @staticmethod
+    def _window_stats(matrix: np.ndarray, lengths: np.ndarray, horizon: Optional[int]) -> Dict[str, List[Any]]:
+        """
+        Stats for every row of a NaN-padded price matrix, truncated to the
+        first `horizon` trading days (None for the full window).
+        Durations are in trading days.
+        """
+        ends = lengths if horizon is None else np.minimum(lengths, horizon)
+        cols = np.arange(matrix.shape[1])
+        prices = np.where(cols[None, :] < ends[:, None], matrix, np.nan)
+        rows = np.arange(len(prices))
+
+        start = prices[:, 0]
+        end = prices[rows, ends - 1]
+        total_return = (end / start - 1) * 100
+
+        # Strict max drawdown (peak to trough). fmax skips the NaN padding.
+        peak = np.fmax.accumulate(prices, axis=1)
+        drawdown = prices / peak - 1
+        max_drawdown = np.nanmin(drawdown, axis=1) * 100
+        time_to_trough = np.nanargmin(drawdown, axis=1)
+
+        # Longest underwater stretch: run length of consecutive drawdown < 0,
+        # reset wherever the price is back at its running peak.
+        underwater = np.nan_to_num(drawdown, nan=0.0) < 0
+        counts = np.cumsum(underwater, axis=1)
+        resets = np.maximum.accumulate(np.where(underwater, 0, counts), axis=1)
+        max_duration = (counts - resets).max(axis=1)
+
+        # Annualized volatility of daily log returns.
+        with np.errstate(invalid="ignore", divide="ignore"), warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            log_returns = np.diff(np.log(prices), axis=1)
+            volatility = np.nanstd(log_returns, axis=1, ddof=1) * np.sqrt(TRADING_DAYS_PER_YEAR) * 100
+        volatility = np.where(ends > 2, volatility, 0.0)
+
+        return {
+            "total_return_pct": np.round(total_return, 2).tolist(),
+            "max_drawdown_pct": np.round(max_drawdown, 2).tolist(),
+            "max_drawdown_duration_days": max_duration.astype(int).tolist(),
+            "time_to_trough_days": time_to_trough.astype(int).tolist(),
+            "volatility_pct": np.round(volatility, 2).tolist()
+        }
+
+    @staticmethod
+    def _timeseries(dates: np.ndarray, prices: np.ndarray, start_price: float) -> Dict[str, List[Any]]:
+        # Normalized (Base 100) series for plotting, as columns (see
+        # output_format); JSON serialization requires strings for dates
+        return {
+            "date": np.datetime_as_string(dates, unit="D").tolist(),
+            "price": np.round(prices, 2).tolist(),
+            "normalized": np.round(100 * prices / start_price, 2).tolist()
+        }
@@ -0,0 +1,136 @@
+import json
+import os
+import numpy as np
+from typing import List, Dict, Any, Optional
+
+
+class NumpyIndex:
+    """
+    Exact cosine-similarity index held as a normalized float32 matrix.
+
+    Implements the slice of the Chroma collection API that VectorEngine uses
+    (count, get, upsert, delete, query), so it can stand in for a collection
+    when the archetype library fits in memory. Distances are cosine
+    distances (1 - cosine similarity), lower is closer.
+
+    When a path is given the index persists to {path}/embeddings.npy plus
+    {path}/records.json; with mmap=True the matrix is memory-mapped
+    read-only instead of loaded.
+    """
+
+    def __init__(self, path: Optional[str] = None, mmap: bool = False):
+        self.path = path
+        self.ids: List[str] = []
+        self.metadatas: List[Dict[str, Any]] = []
+        self.documents: List[str] = []
+        self.matrix = np.zeros((0, 0), dtype=np.float32)
+
+        if path and os.path.exists(self._matrix_path()):
+            self.matrix = np.load(self._matrix_path(), mmap_mode="r" if mmap else None)
+            with open(self._records_path(), "r") as f:
+                records = json.load(f)
+            self.ids = records["ids"]
+            self.metadatas = records["metadatas"]
+            self.documents = records["documents"]
+
+    def _matrix_path(self) -> str:
+        return os.path.join(self.path, "embeddings.npy")
+
+    def _records_path(self) -> str:
+        return os.path.join(self.path, "records.json")
+
+    @staticmethod
+    def _normalize(vectors) -> np.ndarray:
+        arr = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(arr, axis=1, keepdims=True)
+        # Zero vectors (failed embeddings) stay zero instead of becoming NaN.
+        return arr / np.where(norms == 0, 1, norms)
+
+    def count(self) -> int:
+        return len(self.ids)
+
+    def get(self, include: Optional[List[str]] = None) -> Dict[str, List[Any]]:
+        """Returns every stored id with its metadata and document."""
+        return {"ids": list(self.ids), "metadatas": list(self.metadatas), "documents": list(self.documents)}
+
+    def upsert(self, ids: List[str], embeddings: List[List[float]],
+               metadatas: List[Dict[str, Any]], documents: List[str]):
+        """Adds entries, replacing any existing entry with the same id."""
+        rows = self._normalize(embeddings)
+        positions = {id_: i for i, id_ in enumerate(self.ids)}
+        matrix = np.array(self.matrix, dtype=np.float32) if self.matrix.size else np.zeros((0, rows.shape[1]), dtype=np.float32)
+        appended = []
+
+        for row, id_, meta, doc in zip(rows, ids, metadatas, documents):
+            if id_ in positions:
+                pos = positions[id_]
+                matrix[pos] = row
+                self.metadatas[pos] = meta
+                self.documents[pos] = doc
+            else:
+                positions[id_] = len(self.ids)
+                self.ids.append(id_)
+                self.metadatas.append(meta)
+                self.documents.append(doc)
+                appended.append(row)
+
+        if appended:
+            matrix = np.vstack([matrix, np.stack(appended)])
+        self.matrix = matrix
+        self.save()
+
+    def add(self, ids: List[str], embeddings: List[List[float]],
+            metadatas: List[Dict[str, Any]], documents: List[str]):
+        self.upsert(ids, embeddings, metadatas, documents)
+
+    def delete(self, ids: List[str]):
+        """Removes entries by id; unknown ids are ignored."""
+        drop = set(ids)
+        keep = [i for i, id_ in enumerate(self.ids) if id_ not in drop]
+        if len(keep) == len(self.ids):
+            return
+        self.matrix = np.array(self.matrix[keep], dtype=np.float32)
+        self.ids = [self.ids[i] for i in keep]
+        self.metadatas = [self.metadatas[i] for i in keep]
+        self.documents = [self.documents[i] for i in keep]
+        self.save()
+
+    def query(self, query_embeddings: List[List[float]], n_results: int = 3) -> Dict[str, List[List[Any]]]:
+        """
+        Top-k cosine search for a batch of queries: one matrix multiply plus
+        argpartition. Returns the same list-of-lists layout as Chroma.
+        """
+        results = {"ids": [], "distances": [], "metadatas": [], "documents": []}
+        if not self.ids:
+            return results
+
+        queries = self._normalize(query_embeddings)
+        sims = queries @ self.matrix.T  # (n_queries, n_entries)
+        k = min(n_results, sims.shape[1])
+
+        # argpartition picks the unordered top k in O(n); only those k get sorted.
+        top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        top_sims = np.take_along_axis(sims, top, axis=1)
+        order = np.argsort(-top_sims, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_sims = np.take_along_axis(top_sims, order, axis=1)
+
+        for row_idx, row_sims in zip(top, top_sims):
+            results["ids"].append([self.ids[j] for j in row_idx])
+            results["distances"].append([float(1.0 - s) for s in row_sims])
+            results["metadatas"].append([self.metadatas[j] for j in row_idx])
+            results["documents"].append([self.documents[j] for j in row_idx])
+        return results
+
+    def save(self):
+        if not self.path:
+            return
+        os.makedirs(self.path, exist_ok=True)
+        # Write to temp files and swap in, so a reader never sees half an index.
+        matrix_tmp = self._matrix_path() + ".tmp.npy"
+        records_tmp = self._records_path() + ".tmp"
+        np.save(matrix_tmp, np.asarray(self.matrix, dtype=np.float32))
+        with open(records_tmp, "w") as f:
+            json.dump({"ids": self.ids, "metadatas": self.metadatas, "documents": self.documents}, f)
+        os.replace(matrix_tmp, self._matrix_path())
+        os.replace(records_tmp, self._records_path())
@@ -0,0 +1,190 @@
+import json
+import os
+import threading
+import numpy as np
+import pandas as pd
+from datetime import date, timedelta
+from typing import Dict, List, Tuple
+from src.infrastructure.tracing import span
+
+PRICE_STORE_DIR = os.getenv("PRICE_STORE_DIR", "./data/prices")
+
+# yf.download collects results in module-level shared state, so concurrent
+# calls from the holding worker pool can cross-contaminate. Serialize them.
+_YF_DOWNLOAD_LOCK = threading.Lock()
+
+
+class PriceStore:
+    """
+    Local daily price store, one ticker at a time.
+
+    Each ticker is kept as two sorted columns, {TICKER}.dates.npy
+    (datetime64[D]) and {TICKER}.prices.npy (float64), plus a
+    {TICKER}.json sidecar recording the calendar ranges already fetched
+    (disjoint intervals, so a ticker queried for 2008 and then 2020 does not
+    pull in the years between). Reads are memory-mapped and return views
+    into those columns. Only the parts of a requested range not yet covered
+    are downloaded; later dates are appended to the end of the columns.
+    """
+
+    def __init__(self, root: str = PRICE_STORE_DIR):
+        self.root = root
+        self.downloads = 0
+        self._columns: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _lock_for(self, ticker: str) -> threading.Lock:
+        with self._locks_lock:
+            if ticker not in self._locks:
+                self._locks[ticker] = threading.Lock()
+            return self._locks[ticker]
+
+    def _path(self, ticker: str, suffix: str) -> str:
+        safe = ticker.upper().replace("/", "_")
+        return os.path.join(self.root, f"{safe}.{suffix}")
+
+    def _read_coverage(self, ticker: str) -> List[Tuple[date, date]]:
+        path = self._path(ticker, "json")
+        if not os.path.exists(path):
+            return []
+        with open(path, "r") as f:
+            meta = json.load(f)
+        if "coverage" not in meta:
+            # Sidecars written before coverage could have gaps held one range
+            return [(date.fromisoformat(meta["coverage_start"]), date.fromisoformat(meta["coverage_end"]))]
+        return [(date.fromisoformat(a), date.fromisoformat(b)) for a, b in meta["coverage"]]
+
+    def _load(self, ticker: str) -> Tuple[np.ndarray, np.ndarray]:
+        if ticker not in self._columns:
+            dates_path = self._path(ticker, "dates.npy")
+            if os.path.exists(dates_path):
+                self._columns[ticker] = (
+                    np.load(dates_path, mmap_mode="r"),
+                    np.load(self._path(ticker, "prices.npy"), mmap_mode="r")
+                )
+            else:
+                self._columns[ticker] = (np.array([], dtype="datetime64[D]"), np.array([], dtype=np.float64))
+        return self._columns[ticker]
+
+    @staticmethod
+    def _missing_ranges(coverage: List[Tuple[date, date]], start: date, end: date) -> List[Tuple[date, date]]:
+        """Parts of [start, end] not inside any covered interval (coverage is sorted and disjoint)."""
+        missing = []
+        cursor = start
+        for cov_start, cov_end in coverage:
+            if cov_end < cursor:
+                continue
+            if cov_start > end:
+                break
+            if cov_start > cursor:
+                missing.append((cursor, cov_start - timedelta(days=1)))
+            cursor = cov_end + timedelta(days=1)
+            if cursor > end:
+                return missing
+        missing.append((cursor, end))
+        return missing
+
+    @staticmethod
+    def _merge_coverage(coverage: List[Tuple[date, date]], start: date, end: date) -> List[Tuple[date, date]]:
+        """coverage plus [start, end], with overlapping or adjacent intervals joined."""
+        merged: List[Tuple[date, date]] = []
+        for cov_start, cov_end in sorted(coverage + [(start, end)]):
+            if merged and cov_start <= merged[-1][1] + timedelta(days=1):
+                merged[-1] = (merged[-1][0], max(merged[-1][1], cov_end))
+            else:
+                merged.append((cov_start, cov_end))
+        return merged
+
+    def _download(self, ticker: str, start: date, end: date) -> Tuple[np.ndarray, np.ndarray]:
+        import yfinance as yf  # only needed when the store is missing data
+        with span("price_download", cat="historian", ticker=ticker, start=start.isoformat(), end=end.isoformat()), \
+                _YF_DOWNLOAD_LOCK:
+            df = yf.download(ticker, start=start, end=end + timedelta(days=1), progress=False)
+        self.downloads += 1
+        if df.empty:
+            return np.array([], dtype="datetime64[D]"), np.array([], dtype=np.float64)
+
+        # Handle MultiIndex columns if present (yfinance update)
+        prices = df['Adj Close'] if 'Adj Close' in df.columns else df['Close']
+        # If multi-index (Ticker as column level), flatten or select
+        if isinstance(prices, pd.DataFrame):
+            prices = prices.iloc[:, 0]
+        prices = prices.dropna()
+        return prices.index.values.astype("datetime64[D]"), prices.to_numpy(dtype=np.float64)
+
+    def _write(self, ticker: str, dates: np.ndarray, prices: np.ndarray, coverage: List[Tuple[date, date]]):
+        # Write to temp files and swap in, so a reader never sees a torn column.
+        for suffix, column in (("dates.npy", dates), ("prices.npy", prices)):
+            tmp = self._path(ticker, suffix) + ".tmp.npy"
+            np.save(tmp, column)
+            os.replace(tmp, self._path(ticker, suffix))
+        if coverage:
+            tmp = self._path(ticker, "json") + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump({"coverage": [[a.isoformat(), b.isoformat()] for a, b in coverage]}, f)
+            os.replace(tmp, self._path(ticker, "json"))
+        self._columns.pop(ticker, None)
+
+    def _ensure(self, ticker: str, start: date, end: date):
+        """Downloads whatever part of [start, end] is not stored yet."""
+        coverage = self._read_coverage(ticker)
+        missing = self._missing_ranges(coverage, start, end)
+        if not missing:
+            return
+
+        dates, prices = self._load(ticker)
+        dates, prices = np.array(dates), np.array(prices)
+        fetched_any = False
+        complete = True
+        for gap_start, gap_end in missing:
+            new_dates, new_prices = self._download(ticker, gap_start, gap_end)
+            if new_dates.size == 0:
+                # A few days can legitimately hold no sessions (weekends,
+                # holidays); a longer empty gap means the download failed.
+                if (gap_end - gap_start).days >= 5:
+                    complete = False
+                continue
+            fetched_any = True
+            if dates.size and new_dates[0] > dates[-1]:
+                # Common case: newer dates are a plain append.
+                dates = np.concatenate([dates, new_dates])
+                prices = np.concatenate([prices, new_prices])
+            else:
+                dates = np.concatenate([new_dates, dates])
+                prices = np.concatenate([new_prices, prices])
+                order = np.argsort(dates, kind="stable")
+                dates, prices = dates[order], prices[order]
+                dates, first = np.unique(dates, return_index=True)
+                prices = prices[first]
+
+        if not complete:
+            # Keep what did arrive but leave coverage alone, so the failed
+            # range is retried on the next call.
+            if fetched_any:
+                self._write(ticker, dates, prices, coverage)
+            return
+
+        # Today's bar is still moving; only mark complete days as covered.
+        yesterday = date.today() - timedelta(days=1)
+        covered_end = max(min(end, yesterday), start)
+        self._write(ticker, dates, prices, self._merge_coverage(coverage, start, covered_end))
+
+    def get_slice(self, ticker: str, start: date, end: date) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns (dates, prices) for start <= date <= end, fetching any
+        missing range first. Both arrays are views into the stored columns.
+        """
+        with self._lock_for(ticker):
+            self._ensure(ticker, start, end)
+            dates, prices = self._load(ticker)
+
+        lo = np.searchsorted(dates, np.datetime64(start, "D"), side="left")
+        hi = np.searchsorted(dates, np.datetime64(end, "D"), side="right")
+        return dates[lo:hi], prices[lo:hi]
+
+    def count(self, ticker: str) -> int:
+        """Number of stored rows for ticker."""
+        with self._lock_for(ticker):
+            return int(self._load(ticker)[0].size)
@@ -0,0 +1,220 @@
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+
+# One bedrock-runtime client per region, shared by the Scout, the Advisor and
+# the Historian. Every call passes through a per-model token bucket (requests
+# per second) and a cap on in-flight requests; throttled calls are retried
+# with full-jitter exponential backoff, and each throttle lowers that model's
+# rate (recovering gradually on success) so sustained load settles just under
+# the account quota instead of hammering it.
+BEDROCK_MAX_IN_FLIGHT = int(os.getenv("BEDROCK_MAX_IN_FLIGHT", "16"))
+BEDROCK_MAX_RETRIES = int(os.getenv("BEDROCK_MAX_RETRIES", "6"))
+BEDROCK_BACKOFF_BASE_SECONDS = float(os.getenv("BEDROCK_BACKOFF_BASE_SECONDS", "0.5"))
+BEDROCK_BACKOFF_CAP_SECONDS = float(os.getenv("BEDROCK_BACKOFF_CAP_SECONDS", "20"))
+
+# Requests per second per model id. A rate of 0 disables limiting for that model.
+BEDROCK_MODEL_RPS = {
+    "anthropic.claude-3-5-sonnet-20240620-v1:0": float(os.getenv("BEDROCK_CLAUDE_RPS", "4")),
+    "amazon.titan-embed-text-v1": float(os.getenv("BEDROCK_TITAN_RPS", "20"))
+}
+BEDROCK_DEFAULT_RPS = float(os.getenv("BEDROCK_DEFAULT_RPS", "4"))
+
+THROTTLE_ERROR_CODES = {
+    "ThrottlingException", "TooManyRequestsException", "ServiceUnavailableException",
+    "ModelNotReadyException", "ServiceQuotaExceededException"
+}
+# After a throttle the model's rate is multiplied by this factor; every
+# success then raises it by RATE_RECOVERY of the configured rate.
+RATE_BACKOFF = 0.7
+RATE_RECOVERY = 0.02
+MIN_RATE_FRACTION = 0.1
+
+
+class TokenBucket:
+    """
+    Blocking token bucket: acquire() waits until a request may start.
+    The rate can be lowered on throttling and recovers towards its ceiling.
+    """
+
+    def __init__(self, rate_per_second: float, burst: Optional[float] = None):
+        self.max_rate = rate_per_second
+        self.rate = rate_per_second
+        self.burst = burst if burst is not None else max(1.0, rate_per_second)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if self.max_rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def throttled(self):
+        with self._lock:
+            self.rate = max(self.max_rate * MIN_RATE_FRACTION, self.rate * RATE_BACKOFF)
+
+    def succeeded(self):
+        if self.rate < self.max_rate:
+            with self._lock:
+                self.rate = min(self.max_rate, self.rate + self.max_rate * RATE_RECOVERY)
+
+
+# boto3/botocore are imported when the first gateway is built, not when this
+# module is, so importing the Scout stays cheap on a Lambda cold start.
+def _is_throttle(error: Exception) -> bool:
+    from botocore.exceptions import ClientError
+    if isinstance(error, ClientError):
+        code = error.response.get("Error", {}).get("Code", "")
+        status = error.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+        return code in THROTTLE_ERROR_CODES or status in (429, 503)
+    return False
+
+
+def _is_transient(error: Exception) -> bool:
+    from botocore.exceptions import ConnectionError as BotoConnectionError, ReadTimeoutError
+    return isinstance(error, (BotoConnectionError, ReadTimeoutError))
+
+
+class BedrockGateway:
+    """
+    Drop-in for a bedrock-runtime client's invoke_model, with rate limiting,
+    an in-flight cap and retries. The returned response carries the number of
+    retries this gateway made in ResponseMetadata["RetryAttempts"]; an error
+    it gives up on carries them in its gateway_retries attribute.
+    """
+
+    def __init__(self, region_name: str = "us-east-1", max_in_flight: int = BEDROCK_MAX_IN_FLIGHT,
+                 max_retries: int = BEDROCK_MAX_RETRIES):
+        self.region_name = region_name
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_retries = max_retries
+        import boto3
+        from botocore.config import Config
+        # Retries are handled here, so botocore's own retry loop is switched off.
+        self.client = boto3.client(
+            "bedrock-runtime",
+            region_name=region_name,
+            config=Config(max_pool_connections=self.max_in_flight, retries={"max_attempts": 1, "mode": "standard"})
+        )
+        self._slots = threading.BoundedSemaphore(self.max_in_flight)
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self._peak_waiting = 0
+        self._in_flight = 0
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _bucket(self, model_id: str) -> TokenBucket:
+        with self._lock:
+            if model_id not in self._buckets:
+                self._buckets[model_id] = TokenBucket(BEDROCK_MODEL_RPS.get(model_id, BEDROCK_DEFAULT_RPS))
+            return self._buckets[model_id]
+
+    def _count(self, model_id: str, field: str):
+        with self._lock:
+            stats = self._stats.setdefault(model_id, {"requests": 0, "throttles": 0, "retries": 0, "errors": 0})
+            stats[field] += 1
+
+    def invoke_model(self, modelId: str, body: str, **kwargs) -> Dict[str, Any]:
+        return self._call(self.client.invoke_model, modelId, body, **kwargs)
+
+    def invoke_model_with_response_stream(self, modelId: str, body: str, **kwargs) -> Dict[str, Any]:
+        """
+        Streaming variant. Rate limiting and retries apply to opening the
+        stream; an error raised while reading it is left to the caller.
+        """
+        return self._call(self.client.invoke_model_with_response_stream, modelId, body, **kwargs)
+
+    def _call(self, method, modelId: str, body: str, **kwargs) -> Dict[str, Any]:
+        bucket = self._bucket(modelId)
+        self._count(modelId, "requests")
+        attempt = 0
+        while True:
+            with self._lock:
+                self._waiting += 1
+                self._peak_waiting = max(self._peak_waiting, self._waiting)
+            try:
+                bucket.acquire()
+                self._slots.acquire()
+            finally:
+                with self._lock:
+                    self._waiting -= 1
+            with self._lock:
+                self._in_flight += 1
+            try:
+                response = method(modelId=modelId, body=body, **kwargs)
+                bucket.succeeded()
+                response.setdefault("ResponseMetadata", {})["RetryAttempts"] = attempt
+                return response
+            except Exception as e:
+                error = e
+                throttled = _is_throttle(e)
+                if throttled:
+                    self._count(modelId, "throttles")
+                    bucket.throttled()
+                if attempt >= self.max_retries or not (throttled or _is_transient(e)):
+                    self._count(modelId, "errors")
+                    # Read by metrics.retry_attempts; botocore's own count is always 0 here
+                    e.gateway_retries = attempt
+                    raise
+            finally:
+                with self._lock:
+                    self._in_flight -= 1
+                self._slots.release()
+
+            attempt += 1
+            self._count(modelId, "retries")
+            delay = random.uniform(0, min(BEDROCK_BACKOFF_CAP_SECONDS, BEDROCK_BACKOFF_BASE_SECONDS * 2 ** attempt))
+            reason = "throttled" if _is_throttle(error) else f"transient error ({error.__class__.__name__})"
+            print(f"  [Bedrock] {modelId} {reason}, retry {attempt}/{self.max_retries} in {delay:.2f}s")
+            time.sleep(delay)
+
+    def queue_depth(self) -> int:
+        """Calls currently waiting for a rate-limit token or an in-flight slot."""
+        with self._lock:
+            return self._waiting
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_in_flight": self.max_in_flight,
+                "in_flight": self._in_flight,
+                "queue_depth": self._waiting,
+                "peak_queue_depth": self._peak_waiting,
+                "models": {
+                    model_id: {
+                        **counts,
+                        "rate_limit_rps": round(self._buckets[model_id].rate, 3) if model_id in self._buckets else None
+                    }
+                    for model_id, counts in self._stats.items()
+                }
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats = {}
+            self._peak_waiting = self._waiting
+
+
+_gateways: Dict[str, BedrockGateway] = {}
+_gateways_lock = threading.Lock()
+
+
+def get_bedrock_gateway(region_name: str = "us-east-1") -> BedrockGateway:
+    """The process-wide gateway for region_name, created on first use."""
+    with _gateways_lock:
+        if region_name not in _gateways:
+            _gateways[region_name] = BedrockGateway(region_name=region_name)
+        return _gateways[region_name]
@@ -0,0 +1,175 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+CACHE_DIR = os.getenv("SENTINEL_CACHE_DIR", "./data/cache")
+
+# News search results: identical q/tbs pairs within a trading day are served
+# from disk instead of spending another SerpApi credit.
+SEARCH_CACHE_TTL_SECONDS = int(os.getenv("SEARCH_CACHE_TTL_SECONDS", str(6 * 3600)))
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "5000"))
+
+# Bedrock completions: byte-identical requests (reruns, retries after a
+# partial failure) reuse the stored response. LLM_CACHE_BYPASS=1 skips reads
+# but still stores fresh responses.
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+LLM_CACHE_BYPASS = os.getenv("LLM_CACHE_BYPASS", "0") == "1"
+
+
+class PersistentCache:
+    """
+    Disk-backed key/value cache on SQLite.
+
+    Every entry carries its own expiry (defaulting to ttl_seconds) and a
+    last-access time; once the store grows past max_entries the least
+    recently used entries are evicted. Values are raw bytes, with JSON
+    helpers on top. Safe to share across threads.
+    """
+
+    def __init__(self, path: str, ttl_seconds: int = 3600, max_entries: int = 10000):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY,"
+            " value BLOB NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_access ON entries(last_access)")
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Returns the cached bytes for key, or None if missing or expired."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] <= now:
+                if row is not None:
+                    self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def set(self, key: str, value: bytes, ttl_seconds: Optional[int] = None):
+        """Stores value under key. A TTL of zero or less disables storage."""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        if ttl <= 0:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, sqlite3.Binary(value), now + ttl, now)
+            )
+            self._evict()
+
+    def get_json(self, key: str) -> Any:
+        raw = self.get(key)
+        return None if raw is None else json.loads(raw)
+
+    def set_json(self, key: str, value: Any, ttl_seconds: Optional[int] = None):
+        self.set(key, json.dumps(value).encode("utf-8"), ttl_seconds)
+
+    def _evict(self):
+        """Drops expired entries, then least recently used ones beyond max_entries."""
+        count = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        if count <= self.max_entries:
+            return
+        self._conn.execute("DELETE FROM entries WHERE expires_at <= ?", (time.time(),))
+        count = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            # Trim an extra 10% so we are not evicting on every single insert.
+            overflow += self.max_entries // 10
+            self._conn.execute(
+                "DELETE FROM entries WHERE key IN "
+                "(SELECT key FROM entries ORDER BY last_access ASC LIMIT ?)",
+                (overflow,)
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "entries": entries
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+
+_caches: Dict[str, PersistentCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(name: str, ttl_seconds: int, max_entries: int) -> PersistentCache:
+    """
+    Returns the process-wide cache stored at CACHE_DIR/{name}.sqlite,
+    creating it on first use so every client shares one connection.
+    """
+    with _caches_lock:
+        if name not in _caches:
+            path = os.path.join(CACHE_DIR, f"{name}.sqlite")
+            _caches[name] = PersistentCache(path, ttl_seconds=ttl_seconds, max_entries=max_entries)
+        return _caches[name]
+
+
+def get_search_cache() -> PersistentCache:
+    return get_cache("search", SEARCH_CACHE_TTL_SECONDS, SEARCH_CACHE_MAX_ENTRIES)
+
+
+def get_llm_cache() -> PersistentCache:
+    return get_cache("llm_responses", LLM_CACHE_TTL_SECONDS, LLM_CACHE_MAX_ENTRIES)
+
+
+def llm_cache_key(model_id: str, system_prompt: str, prompt: str, temperature: float, max_tokens: int) -> str:
+    """Hash of everything that determines a completion."""
+    payload = json.dumps([model_id, system_prompt, prompt, temperature, max_tokens])
+    return "llm|" + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def cacheable_completion(text: str, validate: Optional[Callable[[str], Any]] = None) -> bool:
+    """
+    Whether a completion may be stored in (or served from) the LLM cache:
+    it must be non-empty and, if validate is given, parse with it. A
+    truncated or malformed response is retried on the next run instead of
+    being replayed for the whole TTL.
+    """
+    if not text:
+        return False
+    if validate is None:
+        return True
+    try:
+        validate(text)
+        return True
+    except Exception:
+        return False
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a search query, for cache keys."""
+    return " ".join(query.lower().split())
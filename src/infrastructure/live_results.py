@@ -0,0 +1,63 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+# Partial Advisor reports of the run in progress, for the dashboard to show
+# verdicts before the run finishes. Layout:
+# {"run_started": iso, "updated": iso, "status": "running" | "finished",
+#  "holdings": {SYMBOL: {"status": "streaming" | "complete", "report": {...},
+#                        "complete_fields": [...]}}}
+LIVE_RESULTS_PATH = os.getenv("SENTINEL_LIVE_RESULTS_PATH", "data/scout_live.json")
+# Streaming text is flushed at most this often; a field completing (e.g. the
+# verdict) is always flushed straight away.
+LIVE_FLUSH_INTERVAL_SECONDS = float(os.getenv("SENTINEL_LIVE_FLUSH_INTERVAL_SECONDS", "0.5"))
+
+
+class LiveResults:
+    """Thread-safe writer for the live results file. Writes are atomic."""
+
+    def __init__(self, path: str = LIVE_RESULTS_PATH, min_interval: float = LIVE_FLUSH_INTERVAL_SECONDS):
+        self.path = path
+        self.min_interval = min_interval
+        self._doc: Dict[str, Any] = {}
+        self._last_flush = 0.0
+        self._lock = threading.Lock()
+
+    def start(self, symbols: List[str]):
+        with self._lock:
+            now = datetime.now().isoformat()
+            self._doc = {"run_started": now, "updated": now, "status": "running",
+                         "expected": list(symbols), "holdings": {}}
+            self._flush()
+
+    def update(self, symbol: str, report: Dict[str, Any], complete_fields: Optional[List[str]] = None,
+               done: bool = False):
+        with self._lock:
+            holdings = self._doc.setdefault("holdings", {})
+            previous = holdings.get(symbol, {})
+            fields = list(complete_fields if complete_fields is not None else report.keys())
+            holdings[symbol] = {"status": "complete" if done else "streaming", "report": dict(report),
+                                "complete_fields": fields}
+            field_completed = len(fields) != len(previous.get("complete_fields", []))
+            if done or field_completed or time.monotonic() - self._last_flush >= self.min_interval:
+                self._flush()
+
+    def finish(self):
+        with self._lock:
+            self._doc["status"] = "finished"
+            self._flush()
+
+    def _flush(self):
+        self._doc["updated"] = datetime.now().isoformat()
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(self._doc, f)
+            os.replace(tmp, self.path)
+            self._last_flush = time.monotonic()
+        except Exception as e:
+            print(f"Could not write live results: {e}")
@@ -0,0 +1,138 @@
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+METRICS_PATH = os.getenv("SENTINEL_METRICS_PATH", "data/scout_metrics.json")
+
+# On-demand Bedrock prices in USD per 1K tokens (input, output), used for the
+# cost estimates in the run summary. Unknown models are reported at zero cost.
+MODEL_PRICING = {
+    "anthropic.claude-3-5-sonnet-20240620-v1:0": (0.003, 0.015),
+    "amazon.titan-embed-text-v1": (0.0001, 0.0)
+}
+
+# Holding the current thread is working on. Stages set it with holding_scope()
+# so calls made deep inside the agents are attributed without threading the
+# symbol through every signature. Calls made outside a scope (e.g. batched
+# Historian embeddings) are reported under SHARED.
+SHARED = "_shared"
+_current_holding: contextvars.ContextVar = contextvars.ContextVar("sentinel_holding", default=None)
+
+
+@contextmanager
+def holding_scope(symbol: Optional[str]):
+    token = _current_holding.set(symbol)
+    try:
+        yield
+    finally:
+        _current_holding.reset(token)
+
+
+def current_holding() -> Optional[str]:
+    return _current_holding.get()
+
+
+def estimate_cost(model_id: str, input_tokens: int, output_tokens: int) -> float:
+    input_price, output_price = MODEL_PRICING.get(model_id, (0.0, 0.0))
+    return input_tokens / 1000 * input_price + output_tokens / 1000 * output_price
+
+
+def _empty_bucket() -> Dict[str, Any]:
+    return {"calls": 0, "cache_hits": 0, "errors": 0, "retries": 0,
+            "input_tokens": 0, "output_tokens": 0, "wall_ms": 0.0, "cost_usd": 0.0}
+
+
+class ModelMetrics:
+    """
+    Records every model call (tokens, wall time, model id, outcome, retries)
+    and aggregates them per stage and per holding. Safe to share across threads.
+
+    outcome is "ok", "error" or "cache_hit"; cache hits cost nothing but are
+    counted so hit rates can be read per stage.
+    """
+
+    def __init__(self):
+        self._calls: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, model_id: str, outcome: str = "ok", input_tokens: int = 0,
+               output_tokens: int = 0, wall_ms: float = 0.0, retries: int = 0,
+               holding: Optional[str] = None):
+        call = {
+            "stage": stage,
+            "holding": holding or current_holding() or SHARED,
+            "model_id": model_id,
+            "outcome": outcome,
+            "input_tokens": int(input_tokens or 0),
+            "output_tokens": int(output_tokens or 0),
+            "wall_ms": round(wall_ms, 2),
+            "retries": int(retries or 0),
+            "ts": time.time()
+        }
+        with self._lock:
+            self._calls.append(call)
+
+    def calls(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._calls)
+
+    def summary(self) -> Dict[str, Any]:
+        """Totals overall, per stage and per holding."""
+        totals = _empty_bucket()
+        by_stage: Dict[str, Dict[str, Any]] = {}
+        by_holding: Dict[str, Dict[str, Any]] = {}
+
+        for call in self.calls():
+            cost = estimate_cost(call["model_id"], call["input_tokens"], call["output_tokens"])
+            for bucket in (totals,
+                           by_stage.setdefault(call["stage"], _empty_bucket()),
+                           by_holding.setdefault(call["holding"], _empty_bucket())):
+                bucket["calls"] += 1
+                bucket["cache_hits"] += call["outcome"] == "cache_hit"
+                bucket["errors"] += call["outcome"] == "error"
+                bucket["retries"] += call["retries"]
+                bucket["input_tokens"] += call["input_tokens"]
+                bucket["output_tokens"] += call["output_tokens"]
+                bucket["wall_ms"] += call["wall_ms"]
+                bucket["cost_usd"] += cost
+
+        for bucket in [totals, *by_stage.values(), *by_holding.values()]:
+            bucket["wall_ms"] = round(bucket["wall_ms"], 2)
+            bucket["cost_usd"] = round(bucket["cost_usd"], 6)
+        return {"totals": totals, "by_stage": by_stage, "by_holding": by_holding}
+
+    def write(self, path: str = METRICS_PATH, extra: Optional[Dict[str, Any]] = None) -> str:
+        """Writes the summary plus every individual call to path (atomically)."""
+        doc = {**(extra or {}), **self.summary(), "calls": self.calls()}
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(doc, f, indent=2)
+        os.replace(tmp, path)
+        return path
+
+    def reset(self):
+        with self._lock:
+            self._calls = []
+
+
+_model_metrics = ModelMetrics()
+
+
+def get_model_metrics() -> ModelMetrics:
+    """The process-wide recorder every Bedrock client reports to."""
+    return _model_metrics
+
+
+def retry_attempts(outcome: Any) -> int:
+    """
+    Retries the Bedrock gateway made for a call, read from the response it
+    returned or from the exception it re-raised after its last attempt.
+    """
+    if isinstance(outcome, BaseException):
+        return getattr(outcome, "gateway_retries", 0)
+    return (outcome or {}).get("ResponseMetadata", {}).get("RetryAttempts", 0)
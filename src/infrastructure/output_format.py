@@ -0,0 +1,248 @@
+import gzip
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+# Output formats written by the Scout:
+# - "json":        legacy layout, every historical_context entry embeds its own
+#                  performance and a list-of-dicts timeseries (indent=2).
+# - "compact":     performance lives once per archetype in a shared
+#                  "archetype_performance" table with columnar timeseries
+#                  ({"date": [...], "price": [...], "normalized": [...]}), and
+#                  historical_context entries point at it via "performance_ref".
+# - "compact.gz":  the compact document, gzip-compressed.
+COMPACT_FORMAT = "sentinel-compact/1"
+OUTPUT_FORMATS = ("json", "compact", "compact.gz")
+
+# Plain "compact" snapshots get a sidecar index (<snapshot>.idx) with the
+# byte span of every holding and of the archetype_performance table, plus a
+# small digest per holding, so the dashboard can memory-map the snapshot and
+# decode only the holdings it shows. It is written after the snapshot; a
+# reader must check that its size and timestamp match the snapshot's.
+INDEX_FORMAT = "sentinel-index/1"
+_SEPARATORS = (",", ":")
+
+
+def _rows(timeseries) -> List[Dict[str, Any]]:
+    """Columnar timeseries as the legacy list of {"date", "price", "normalized"} rows."""
+    if not isinstance(timeseries, dict):
+        return timeseries
+    return [{"date": d, "price": p, "normalized": n}
+            for d, p, n in zip(timeseries["date"], timeseries["price"], timeseries["normalized"])]
+
+
+def _columnar(timeseries) -> Dict[str, list]:
+    if isinstance(timeseries, dict):
+        return timeseries
+    return {
+        "date": [row["date"] for row in timeseries],
+        "price": [row["price"] for row in timeseries],
+        "normalized": [row["normalized"] for row in timeseries]
+    }
+
+
+def _map_timeseries(output: Dict[str, Any], convert) -> Dict[str, Any]:
+    """A copy of a run output with every inline timeseries passed through convert."""
+    holdings = {}
+    for symbol, holding in output.get("data", {}).get("holdings", {}).items():
+        contexts = []
+        for ctx in holding.get("historical_context", []):
+            perf = ctx.get("performance")
+            if isinstance(perf, dict) and "timeseries" in perf:
+                ctx = {**ctx, "performance": {**perf, "timeseries": convert(perf["timeseries"])}}
+            contexts.append(ctx)
+        holdings[symbol] = {**holding, "historical_context": contexts}
+    return {**output, "data": {**output.get("data", {}), "holdings": holdings}}
+
+
+def to_compact(output: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Converts a run output into the compact layout. Holdings that matched the
+    same archetype share one performance entry.
+    """
+    table: Dict[str, Dict[str, Any]] = {}
+    holdings = {}
+
+    for symbol, holding in output.get("data", {}).get("holdings", {}).items():
+        contexts = []
+        for ctx in holding.get("historical_context", []):
+            archetype = ctx.get("archetype", {})
+            perf = ctx.get("performance", {})
+
+            # Keyed by archetype id; a differing entry under the same id (e.g. a
+            # fallback ticker) gets a numbered suffix instead of overwriting.
+            base = str(archetype.get("archetype_id") or archetype.get("name"))
+            ref, n = base, 1
+            while ref in table and table[ref] != perf:
+                n += 1
+                ref = f"{base}#{n}"
+            table[ref] = perf
+            contexts.append({"archetype": archetype, "performance_ref": ref})
+
+        holdings[symbol] = {**holding, "historical_context": contexts}
+
+    return {
+        "format": COMPACT_FORMAT,
+        "timestamp": output.get("timestamp"),
+        "config": output.get("config", {}),
+        "archetype_performance": table,
+        "data": {**output.get("data", {}), "holdings": holdings}
+    }
+
+
+def expand(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Resolves performance_ref entries of a compact document back into inline
+    "performance" dicts. Timeseries stay columnar; pandas.DataFrame accepts
+    either layout. Legacy documents are returned unchanged.
+    """
+    if doc.get("format") != COMPACT_FORMAT:
+        return doc
+    table = doc.get("archetype_performance", {})
+    for holding in doc.get("data", {}).get("holdings", {}).values():
+        for ctx in holding.get("historical_context", []):
+            if "performance_ref" in ctx:
+                ctx["performance"] = table.get(ctx.pop("performance_ref"), {"error": "Missing performance entry"})
+    return doc
+
+
+def event_score(event: Dict[str, Any]) -> float:
+    """An event's relevance score as a number (0 if missing or not numeric)."""
+    try:
+        return float(event.get("relevance_score") or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def holding_digest(holding: Dict[str, Any]) -> Dict[str, Any]:
+    """The fields the dashboard's overview table needs, without decoding the holding."""
+    report = holding.get("advisor_report") or {}
+    events = holding.get("events", [])
+    return {
+        "verdict": report.get("verdict"),
+        "confidence": report.get("confidence"),
+        "events": len(events),
+        "top_relevance": max((event_score(e) for e in events), default=None),
+        "recomputed": holding.get("recomputed", True),
+        "failed": str(holding.get("summary", "")).startswith("Processing Failed")
+    }
+
+
+def _dumps_indexed(doc: Dict[str, Any]):
+    """
+    Serializes a compact document exactly as json.dumps(doc, separators=(",", ":"))
+    would, returning the bytes and the index of holding and table spans.
+    Output is ASCII (ensure_ascii), so string offsets are byte offsets.
+    """
+    parts = ["{"]
+    size = 1
+    spans: Dict[str, list] = {}
+    holdings: Dict[str, Dict[str, Any]] = {}
+
+    def emit(text):
+        nonlocal size
+        parts.append(text)
+        size += len(text)
+
+    def emit_value(value):
+        start = size
+        emit(json.dumps(value, separators=_SEPARATORS))
+        return [start, size]
+
+    for n, (key, value) in enumerate(doc.items()):
+        emit(("," if n else "") + json.dumps(key) + ":")
+        if key != "data" or not isinstance(value, dict):
+            spans[key] = emit_value(value)
+            continue
+        emit("{")
+        for m, (data_key, data_value) in enumerate(value.items()):
+            emit(("," if m else "") + json.dumps(data_key) + ":")
+            if data_key != "holdings":
+                emit_value(data_value)
+                continue
+            emit("{")
+            for h, (symbol, holding) in enumerate(data_value.items()):
+                emit(("," if h else "") + json.dumps(symbol) + ":")
+                holdings[symbol] = {"span": emit_value(holding), "digest": holding_digest(holding)}
+            emit("}")
+        emit("}")
+    emit("}")
+
+    index = {
+        "format": INDEX_FORMAT,
+        "size": size,
+        "timestamp": doc.get("timestamp"),
+        "archetype_performance": spans.get("archetype_performance"),
+        "holdings": holdings
+    }
+    return "".join(parts).encode("ascii"), index
+
+
+def index_path(path: str) -> str:
+    return path + ".idx"
+
+
+def dumps(output: Dict[str, Any], fmt: str = "compact") -> bytes:
+    if fmt == "json":
+        return json.dumps(_map_timeseries(output, _rows), indent=2).encode("utf-8")
+    if fmt not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format: {fmt}")
+    payload = json.dumps(to_compact(output), separators=(",", ":")).encode("utf-8")
+    return gzip.compress(payload) if fmt == "compact.gz" else payload
+
+
+def output_path(base_path: str, fmt: str) -> str:
+    """data/scout_latest.json -> data/scout_latest.json.gz for the gzip format."""
+    return base_path + ".gz" if fmt == "compact.gz" else base_path
+
+
+def write_output(output: Dict[str, Any], base_path: str, fmt: str = "compact") -> str:
+    """
+    Writes a run output in the given format and returns the path written.
+    The file is swapped in atomically so readers never see a partial snapshot.
+    """
+    path = output_path(base_path, fmt)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    index = None
+    if fmt == "compact":
+        payload, index = _dumps_indexed(to_compact(output))
+    else:
+        payload = dumps(output, fmt)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(payload)
+    os.replace(tmp, path)
+
+    idx = index_path(path)
+    try:
+        if index:
+            with open(idx + ".tmp", "w") as f:
+                json.dump(index, f, separators=_SEPARATORS)
+            os.replace(idx + ".tmp", idx)
+        elif os.path.exists(idx):
+            os.remove(idx)
+    except OSError as e:
+        print(f"Could not write snapshot index {idx}: {e}")
+    return path
+
+
+def latest_output_path(base_path: str) -> Optional[str]:
+    """The most recently written of base_path and its .gz variant, if any exists."""
+    candidates = [p for p in (base_path, output_path(base_path, "compact.gz")) if os.path.exists(p)]
+    return max(candidates, key=os.path.getmtime) if candidates else None
+
+
+def read_output(path: str) -> Dict[str, Any]:
+    """
+    Reads any output format (gzip detected by magic bytes) and expands it.
+    Timeseries of legacy "json" outputs are converted to columns, the layout
+    the Historian produces.
+    """
+    with open(path, "rb") as f:
+        raw = f.read()
+    if raw[:2] == b"\x1f\x8b":
+        raw = gzip.decompress(raw)
+    doc = json.loads(raw)
+    if doc.get("format") == COMPACT_FORMAT:
+        return expand(doc)
+    return _map_timeseries(doc, _columnar)
@@ -0,0 +1,202 @@
+"""
+Run-scoped JSONL journal of per-holding results.
+
+Each Scout run appends lines per holding to data/runs/<run_id>.jsonl as
+soon as that holding is scouted and again when it is finished, so a crash
+or timeout part-way through keeps everything completed so far and the
+dashboard can tail the run while it is in progress. Line types:
+
+    {"type": "run_start", "run_id": ..., "timestamp": ..., "symbols": [...]}
+    {"type": "scouted", "symbol": ..., "scouted": {...}}
+    {"type": "holding", "symbol": ..., "result": {...}}
+    {"type": "run_end", "run_id": ..., "output_path": ...}
+
+A "scouted" line holds the scout stage's output (summary and events, before
+the Historian and the Advisor). A run that dies during assessment is
+recovered with those holdings summarized but unassessed.
+
+data/runs/current.json points at the newest run and says whether it is
+still running. finalize() writes the consolidated snapshot (atomically, via
+output_format.write_output) and only then marks the run finished.
+
+A run that died before finalizing can be consolidated by hand:
+    python -m src.infrastructure.run_journal data/runs/<run_id>.jsonl
+"""
+import glob
+import json
+import os
+import threading
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.infrastructure.output_format import write_output
+
+RUN_JOURNAL_DIR = os.getenv("SENTINEL_RUN_JOURNAL_DIR", "data/runs")
+# Journals kept on disk; older ones are deleted when a new run starts.
+RUN_JOURNAL_KEEP = int(os.getenv("SENTINEL_RUN_JOURNAL_KEEP", "20"))
+# fsync every line. Off by default: a flushed line survives a process crash,
+# only a machine crash needs the sync.
+RUN_JOURNAL_FSYNC = os.getenv("SENTINEL_RUN_JOURNAL_FSYNC", "0") == "1"
+
+
+def _atomic_write_json(path: str, doc: Dict[str, Any]):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(doc, f)
+    os.replace(tmp, path)
+
+
+class RunJournal:
+    """Append-only journal for one run. Safe to share across threads."""
+
+    def __init__(self, run_id: Optional[str] = None, directory: str = RUN_JOURNAL_DIR):
+        self.run_id = run_id or f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        self.directory = directory
+        self.path = os.path.join(directory, f"{self.run_id}.jsonl")
+        self.pointer_path = os.path.join(directory, "current.json")
+        self._file = None
+        self._lock = threading.Lock()
+
+    def start(self, symbols: List[str], timestamp: Optional[str] = None):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            self._prune()
+            self._file = open(self.path, "a", encoding="utf-8")
+        except Exception as e:
+            # The run still completes and writes its snapshot, just without a journal.
+            print(f"Could not open run journal {self.path}: {e}")
+            return
+        self._append({"type": "run_start", "run_id": self.run_id,
+                      "timestamp": timestamp or datetime.now().isoformat(), "symbols": list(symbols)})
+        self._set_pointer("running")
+
+    def append_scouted(self, symbol: str, scouted: Dict[str, Any]):
+        error = scouted.get("error")
+        self._append({"type": "scouted", "symbol": symbol, "scouted": {
+            "summary": scouted.get("summary", ""),
+            "events": scouted.get("events", []),
+            "fingerprint": scouted.get("fingerprint"),
+            "carried": scouted.get("carried"),
+            "error": str(error) if error else None
+        }})
+
+    def append_holding(self, symbol: str, result: Dict[str, Any]):
+        self._append({"type": "holding", "symbol": symbol, "result": result})
+
+    def finalize(self, output: Dict[str, Any], base_path: str, fmt: str = "compact") -> str:
+        """Writes the consolidated snapshot, then marks the run finished. Returns the snapshot path."""
+        path = write_output(output, base_path, fmt)
+        self._append({"type": "run_end", "run_id": self.run_id, "output_path": path,
+                      "timestamp": datetime.now().isoformat()})
+        self.close()
+        self._set_pointer("finished", output_path=path)
+        return path
+
+    def close(self):
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+    def _append(self, record: Dict[str, Any]):
+        line = json.dumps(record, default=str) + "\n"
+        with self._lock:
+            if self._file is None:
+                return
+            try:
+                self._file.write(line)
+                self._file.flush()
+                if RUN_JOURNAL_FSYNC:
+                    os.fsync(self._file.fileno())
+            except Exception as e:
+                print(f"Could not append to run journal {self.path}: {e}")
+
+    def _set_pointer(self, status: str, output_path: Optional[str] = None):
+        try:
+            _atomic_write_json(self.pointer_path, {
+                "run_id": self.run_id, "path": self.path, "status": status,
+                "output_path": output_path, "updated": datetime.now().isoformat()
+            })
+        except Exception as e:
+            print(f"Could not update run pointer: {e}")
+
+    def _prune(self):
+        journals = sorted(glob.glob(os.path.join(self.directory, "*.jsonl")), key=os.path.getmtime)
+        for old in journals[:max(0, len(journals) - RUN_JOURNAL_KEEP + 1)]:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+
+
+def read_journal(path: str, offset: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Reads the complete lines written after byte offset. Returns the records
+    and the offset to resume from; a partially written last line is left for
+    the next call.
+    """
+    records = []
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            offset += len(line)
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    return records, offset
+
+
+def _from_scouted(scouted: Dict[str, Any]) -> Dict[str, Any]:
+    """A holding entry for one that was scouted but never assessed."""
+    if scouted.get("error"):
+        return {"summary": f"Processing Failed: {scouted['error']}", "events": [], "historical_context": [],
+                "advisor_report": {}, "recomputed": True}
+    if scouted.get("carried"):
+        carried = scouted["carried"]
+        return {**carried, "fingerprint": scouted.get("fingerprint"), "recomputed": False}
+    # No fingerprint, so a delta run recomputes it rather than carrying it forward
+    return {"summary": scouted.get("summary", ""), "events": scouted.get("events", []),
+            "historical_context": [], "advisor_report": {}, "fingerprint": None, "recomputed": True}
+
+
+def consolidate(path: str) -> Dict[str, Any]:
+    """Builds a run output from a journal, finished or not."""
+    records, _ = read_journal(path)
+    start = next((r for r in records if r.get("type") == "run_start"), {})
+    assessed = {r["symbol"]: r["result"] for r in records if r.get("type") == "holding"}
+    scouted = {r["symbol"]: _from_scouted(r["scouted"]) for r in records
+               if r.get("type") == "scouted" and r["symbol"] not in assessed}
+    merged = {**scouted, **assessed}
+    order = [s for s in start.get("symbols", []) if s in merged]
+    holdings = {s: merged[s] for s in order + [s for s in merged if s not in order]}
+    missing = [s for s in start.get("symbols", []) if s not in holdings]
+    return {
+        "timestamp": start.get("timestamp"),
+        "data": {"holdings": holdings},
+        "config": {
+            "run_id": start.get("run_id"),
+            "recovered_from_journal": not any(r.get("type") == "run_end" for r in records),
+            "missing_holdings": missing,
+            "unassessed_holdings": list(scouted)
+        }
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Consolidate a run journal into a snapshot.")
+    parser.add_argument("journal", help="Path to data/runs/<run_id>.jsonl")
+    parser.add_argument("--output", default="data/scout_latest.json")
+    parser.add_argument("--format", default="compact", choices=["json", "compact", "compact.gz"])
+    args = parser.parse_args()
+
+    recovered = consolidate(args.journal)
+    written = write_output(recovered, args.output, args.format)
+    print(f"Wrote {len(recovered['data']['holdings'])} holdings to {written} "
+          f"({len(recovered['config']['unassessed_holdings'])} unassessed, "
+          f"{len(recovered['config']['missing_holdings'])} missing)")
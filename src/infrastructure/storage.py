@@ -1,13 +1,14 @@
-import boto3
 import json
 import os
 from datetime import datetime
 from typing import Dict, Any
+from src.infrastructure.tracing import span
 
 class CloudStorage:
     def __init__(self, bucket_name: str = "lplteam25"):
         self.bucket_name = bucket_name
         # Assumes AWS_ACCESS_KEY_ID etc are in env or ~/.aws/credentials
+        import boto3
         self.s3_client = boto3.client('s3')
         print(f"CloudStorage initialized for bucket: {self.bucket_name}")
 
@@ -17,12 +18,13 @@ class CloudStorage:
         """
         try:
             json_str = json.dumps(data, indent=2, default=str)
-            self.s3_client.put_object(
-                Bucket=self.bucket_name,
-                Key=key,
-                Body=json_str,
-                ContentType='application/json'
-            )
+            with span("s3_put", cat="storage", key=key, bytes=len(json_str)):
+                self.s3_client.put_object(
+                    Bucket=self.bucket_name,
+                    Key=key,
+                    Body=json_str,
+                    ContentType='application/json'
+                )
             print(f"  [S3] Uploaded: s3://{self.bucket_name}/{key}")
             return True
         except Exception as e:
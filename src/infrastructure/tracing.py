@@ -0,0 +1,107 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, List, Optional
+from src.infrastructure.metrics import current_holding
+
+# Per-run span tracing, exported in Chrome's trace_event format (open the file
+# in chrome://tracing or https://ui.perfetto.dev). Enable with SENTINEL_TRACE=1
+# or "trace": true in the event. When disabled, span() returns a shared no-op
+# context manager, so instrumented code pays one attribute check per span.
+TRACE_ENABLED = os.getenv("SENTINEL_TRACE", "0") == "1"
+TRACE_DIR = os.getenv("SENTINEL_TRACE_DIR", "data/traces")
+
+_NOOP = nullcontext()
+
+
+class Tracer:
+    """
+    Collects complete ("X") trace events, one per span, with the thread id as
+    the track so concurrent stages show up side by side. Safe to share
+    across threads.
+    """
+
+    def __init__(self, enabled: bool = TRACE_ENABLED):
+        self.enabled = enabled
+        self._events: List[Dict[str, Any]] = []
+        self._threads: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+
+    def start(self, enabled: bool):
+        """Begins a new run: drops previous events and sets the enabled flag."""
+        with self._lock:
+            self.enabled = enabled
+            self._events = []
+            self._threads = {}
+            self._origin = time.perf_counter()
+
+    @contextmanager
+    def _span(self, name: str, cat: str, args: Dict[str, Any]):
+        holding = current_holding()
+        if holding and "holding" not in args:
+            args["holding"] = holding
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            ended = time.perf_counter()
+            thread = threading.current_thread()
+            event = {
+                "name": name,
+                "cat": cat,
+                "ph": "X",
+                "ts": round((started - self._origin) * 1e6, 1),
+                "dur": round((ended - started) * 1e6, 1),
+                "pid": os.getpid(),
+                "tid": thread.ident,
+                "args": args
+            }
+            with self._lock:
+                self._events.append(event)
+                self._threads.setdefault(thread.ident, thread.name)
+
+    def span(self, name: str, cat: str = "sentinel", **args):
+        """
+        Times the enclosed block. Extra keyword arguments are attached to the
+        event as its args.
+        """
+        if not self.enabled:
+            return _NOOP
+        return self._span(name, cat, args)
+
+    def events(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            names = [
+                {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": name}}
+                for tid, name in self._threads.items()
+            ]
+            return names + list(self._events)
+
+    def write(self, path: Optional[str] = None) -> Optional[str]:
+        """Writes the run's trace to path (default TRACE_DIR/scout_<time>.json). No-op when disabled."""
+        if not self.enabled:
+            return None
+        path = path or os.path.join(TRACE_DIR, f"scout_{time.strftime('%Y%m%d_%H%M%S')}.json")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"traceEvents": self.events(), "displayTimeUnit": "ms"}, f)
+        os.replace(tmp, path)
+        return path
+
+
+_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    return _tracer
+
+
+def span(name: str, cat: str = "sentinel", **args):
+    """Shortcut for get_tracer().span(...)."""
+    if not _tracer.enabled:
+        return _NOOP
+    return _tracer._span(name, cat, args)
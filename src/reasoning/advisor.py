@@ -1,33 +1,163 @@
-import boto3
 import json
+import os
 import re
-from typing import List, Dict, Any
+import time
+from typing import Callable, List, Dict, Any, Optional
+from src.infrastructure.bedrock_gateway import get_bedrock_gateway
+from src.infrastructure.cache import (PersistentCache, cacheable_completion, get_llm_cache, llm_cache_key,
+                                      LLM_CACHE_BYPASS)
+from src.infrastructure.metrics import get_model_metrics, retry_attempts
+from src.infrastructure.tracing import span
+from src.reasoning.stream_parser import StreamingJSONParser
+
+# When analyze_risk is given an on_update callback, the completion is streamed
+# and partial reports are passed to it as fields complete (verdict and
+# confidence first), instead of only after the full response. Set
+# ADVISOR_STREAMING=0 to always wait for the full completion.
+ADVISOR_STREAMING = os.getenv("ADVISOR_STREAMING", "1") == "1"
+
+# on_update(partial_report, complete_fields)
+UpdateCallback = Callable[[Dict[str, Any], List[str]], None]
+
+
+def parse_report(response: str) -> Dict[str, Any]:
+    """The JSON report in an Advisor completion. Raises ValueError if there is none."""
+    # Regex to find JSON block
+    json_match = re.search(r'\{.*\}', response.replace("\n", " "), re.DOTALL)
+    data = json.loads(json_match.group(0) if json_match else response)
+    if not isinstance(data, dict):
+        raise ValueError("Advisor response is not a JSON object")
+    return data
+
 
 class PortfolioAdvisor:
-    def __init__(self, region_name: str = "us-east-1"):
-        self.bedrock = boto3.client("bedrock-runtime", region_name=region_name)
+    def __init__(self, region_name: str = "us-east-1", response_cache: Optional[PersistentCache] = None,
+                 bypass_cache: bool = LLM_CACHE_BYPASS):
+        self.bedrock = get_bedrock_gateway(region_name)
         self.model_id = "anthropic.claude-3-5-sonnet-20240620-v1:0"
+        self.max_tokens = 2000
+        self.temperature = 0.2
+        self.response_cache = response_cache or get_llm_cache()
+        self.bypass_cache = bypass_cache
 
     def _invoke_model(self, prompt: str, system_prompt: str = "") -> str:
+        """
+        Full (non-streaming) completion. Only complete responses that parse as
+        a report are cached, so a truncated or malformed one is retried next run.
+        """
+        metrics = get_model_metrics()
+        cache_key = llm_cache_key(self.model_id, system_prompt, prompt, self.temperature, self.max_tokens)
+        if not self.bypass_cache:
+            cached = self.response_cache.get_json(cache_key)
+            if cached is not None and cacheable_completion(cached, parse_report):
+                metrics.record("advisor", self.model_id, outcome="cache_hit")
+                return cached
+
         body = json.dumps({
             "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": 2000,
+            "max_tokens": self.max_tokens,
             "system": system_prompt,
             "messages": [{"role": "user", "content": prompt}],
-            "temperature": 0.2
+            "temperature": self.temperature
         })
+        started = time.perf_counter()
         try:
-            response = self.bedrock.invoke_model(
-                body=body, modelId=self.model_id, accept="application/json", contentType="application/json"
-            )
-            return json.loads(response.get("body").read())["content"][0]["text"]
+            with span("bedrock_invoke", cat="bedrock", stage="advisor", prompt_chars=len(prompt)):
+                response = self.bedrock.invoke_model(
+                    body=body, modelId=self.model_id, accept="application/json", contentType="application/json"
+                )
+            response_body = json.loads(response.get("body").read())
+            text = response_body["content"][0]["text"]
         except Exception as e:
             print(f"Advisor Error: {e}")
+            metrics.record("advisor", self.model_id, outcome="error",
+                           wall_ms=(time.perf_counter() - started) * 1000,
+                           retries=retry_attempts(e))
             return ""
 
-    def analyze_risk(self, ticker: str, scout_summary: str, historical_contexts: List[Dict]) -> Dict[str, Any]:
+        usage = response_body.get("usage", {})
+        metrics.record("advisor", self.model_id, input_tokens=usage.get("input_tokens", 0),
+                       output_tokens=usage.get("output_tokens", 0),
+                       wall_ms=(time.perf_counter() - started) * 1000,
+                       retries=retry_attempts(response))
+
+        if response_body.get("stop_reason") != "max_tokens" and cacheable_completion(text, parse_report):
+            self.response_cache.set_json(cache_key, text)
+        return text
+
+    def _stream_model(self, prompt: str, system_prompt: str, on_update: UpdateCallback) -> str:
+        """
+        Like _invoke_model, but reads the completion from the response stream
+        and feeds it through an incremental JSON parser, calling on_update
+        whenever the partial report changes. Falls back to _invoke_model if
+        the stream cannot be opened or breaks off. The text is cached only if
+        the stream ran to the end of a complete JSON report.
+        """
+        metrics = get_model_metrics()
+        cache_key = llm_cache_key(self.model_id, system_prompt, prompt, self.temperature, self.max_tokens)
+        if not self.bypass_cache:
+            cached = self.response_cache.get_json(cache_key)
+            if cached is not None and cacheable_completion(cached, parse_report):
+                metrics.record("advisor", self.model_id, outcome="cache_hit")
+                parser = StreamingJSONParser()
+                parser.feed(cached)
+                on_update(parser.snapshot(), list(parser.complete_fields))
+                return cached
+
+        body = json.dumps({
+            "anthropic_version": "bedrock-2023-05-31",
+            "max_tokens": self.max_tokens,
+            "system": system_prompt,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": self.temperature
+        })
+        parser = StreamingJSONParser()
+        parts = []
+        usage = {"input_tokens": 0, "output_tokens": 0}
+        stop_reason = None
+        started = time.perf_counter()
+        try:
+            with span("bedrock_stream", cat="bedrock", stage="advisor", prompt_chars=len(prompt)):
+                response = self.bedrock.invoke_model_with_response_stream(
+                    body=body, modelId=self.model_id, accept="application/json", contentType="application/json"
+                )
+                for event in response.get("body"):
+                    chunk = json.loads(event.get("chunk", {}).get("bytes", b"{}"))
+                    kind = chunk.get("type")
+                    if kind == "message_start":
+                        usage["input_tokens"] = chunk.get("message", {}).get("usage", {}).get("input_tokens", 0)
+                    elif kind == "message_delta":
+                        usage["output_tokens"] = chunk.get("usage", {}).get("output_tokens", 0)
+                        stop_reason = chunk.get("delta", {}).get("stop_reason")
+                    elif kind == "content_block_delta":
+                        text = chunk.get("delta", {}).get("text", "")
+                        parts.append(text)
+                        if parser.feed(text):
+                            on_update(parser.snapshot(), list(parser.complete_fields))
+        except Exception as e:
+            print(f"Advisor stream failed, retrying without streaming: {e}")
+            metrics.record("advisor", self.model_id, outcome="error",
+                           wall_ms=(time.perf_counter() - started) * 1000,
+                           retries=retry_attempts(e))
+            return self._invoke_model(prompt, system_prompt)
+
+        text = "".join(parts)
+        metrics.record("advisor", self.model_id, input_tokens=usage["input_tokens"],
+                       output_tokens=usage["output_tokens"],
+                       wall_ms=(time.perf_counter() - started) * 1000,
+                       retries=retry_attempts(response))
+        if parser.done and stop_reason != "max_tokens" and cacheable_completion(text, parse_report):
+            self.response_cache.set_json(cache_key, text)
+        return text
+
+    def analyze_risk(self, ticker: str, scout_summary: str, historical_contexts: List[Dict],
+                     on_update: Optional[UpdateCallback] = None) -> Dict[str, Any]:
         """
         Synthesizes the news (Scout) and history (Historian) into a strategic verdict.
+
+        If on_update is given (and ADVISOR_STREAMING is on), it is called with
+        the partial report as the completion streams in, so the verdict can be
+        shown before the synthesis and action plan are finished.
         """
         # 1. Format Historical Context for the Prompt
         history_text = ""
@@ -61,17 +191,14 @@ class PortfolioAdvisor:
             "\nOutput ONLY Valid JSON."
         )
 
-        response = self._invoke_model(prompt, system_prompt)
+        if on_update and ADVISOR_STREAMING:
+            response = self._stream_model(prompt, system_prompt, on_update)
+        else:
+            response = self._invoke_model(prompt, system_prompt)
         
         # Robust Parsing
         try:
-            # Regex to find JSON block
-            json_match = re.search(r'\{.*\}', response.replace("\n", " "), re.DOTALL)
-            if json_match:
-                data = json.loads(json_match.group(0))
-                return data
-            else:
-                return json.loads(response) # Try direct parse
+            return parse_report(response)
         except Exception as e:
             print(f"Advisor Parse Error: {e}")
             return {
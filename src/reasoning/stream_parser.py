@@ -0,0 +1,197 @@
+import json
+from typing import Any, Dict, List, Optional
+
+_WHITESPACE = " \t\r\n"
+
+
+class StreamingJSONParser:
+    """
+    Incremental parser for one top-level JSON object arriving in text chunks
+    (e.g. a streamed completion).
+
+    feed() returns the fields that became available with that chunk, as a
+    dict of key -> value:
+
+    - a field appears with its final value once the value is complete;
+    - while a top-level string is still open, its text so far is reported
+      on every chunk that extends it;
+    - while a top-level array is still open, the list of elements completed
+      so far is reported each time another element completes.
+
+    snapshot() returns everything known so far, and complete_fields lists
+    the keys whose values are final. Text before the opening brace (prose,
+    a ```json fence) is skipped. Nested values are buffered and decoded with
+    json.loads when they close.
+    """
+
+    def __init__(self):
+        self.fields: Dict[str, Any] = {}
+        self.complete_fields: List[str] = []
+        self.done = False
+
+        self._state = "preamble"  # preamble, key_or_end, key, colon, value, comma_or_end
+        self._key_chars: List[str] = []
+        self._key: Optional[str] = None
+        self._escape = False
+
+        # Current value
+        self._kind: Optional[str] = None  # "string", "array", "object", "scalar"
+        self._raw: List[str] = []  # raw JSON text of the current value
+        self._depth = 0
+        self._in_string = False
+        self._element_start = 0  # offset in _raw where the current array element starts
+        self._elements: List[Any] = []
+
+    def feed(self, chunk: str) -> Dict[str, Any]:
+        updates: Dict[str, Any] = {}
+        for ch in chunk:
+            if self.done:
+                break
+            self._step(ch, updates)
+        # An open string is reported once per chunk rather than per character.
+        if self._state == "value" and self._kind == "string":
+            updates[self._key] = self._partial_string()
+            self.fields[self._key] = updates[self._key]
+        return updates
+
+    def snapshot(self) -> Dict[str, Any]:
+        return dict(self.fields)
+
+    def _partial_string(self) -> str:
+        text = "".join(self._raw)
+        # Drop an escape sequence that is still being received before decoding.
+        if self._escape:
+            text = text[:-1]
+        else:
+            cut = text.rfind("\\u")
+            if cut != -1 and len(text) - cut < 6:
+                text = text[:cut]
+        try:
+            return json.loads(text + '"')
+        except ValueError:
+            return text[1:]
+
+    def _finish_value(self, updates: Dict[str, Any]):
+        raw = "".join(self._raw)
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            value = raw.strip()
+        self.fields[self._key] = value
+        self.complete_fields.append(self._key)
+        updates[self._key] = value
+        self._kind = None
+        self._raw = []
+        self._elements = []
+        self._state = "comma_or_end"
+
+    def _step(self, ch: str, updates: Dict[str, Any]):
+        state = self._state
+
+        if state == "preamble":
+            if ch == "{":
+                self._state = "key_or_end"
+            return
+
+        if state in ("key_or_end", "comma_or_end"):
+            if ch == "}":
+                self.done = True
+            elif ch == '"' and state == "key_or_end":
+                self._state = "key"
+                self._key_chars = []
+            elif ch == ",":
+                self._state = "key_or_end"
+            return
+
+        if state == "key":
+            if self._escape:
+                self._key_chars.append(ch)
+                self._escape = False
+            elif ch == "\\":
+                self._key_chars.append(ch)
+                self._escape = True
+            elif ch == '"':
+                self._key = json.loads('"' + "".join(self._key_chars) + '"')
+                self._state = "colon"
+            else:
+                self._key_chars.append(ch)
+            return
+
+        if state == "colon":
+            if ch == ":":
+                self._state = "value"
+                self._kind = None
+            return
+
+        # state == "value"
+        if self._kind is None:
+            if ch in _WHITESPACE:
+                return
+            self._raw = [ch]
+            if ch == '"':
+                self._kind = "string"
+            elif ch in "[{":
+                self._kind = "array" if ch == "[" else "object"
+                self._depth = 1
+                self._in_string = False
+                self._element_start = 1
+                self._elements = []
+            else:
+                self._kind = "scalar"
+            return
+
+        if self._kind == "string":
+            self._raw.append(ch)
+            if self._escape:
+                self._escape = False
+            elif ch == "\\":
+                self._escape = True
+            elif ch == '"':
+                self._finish_value(updates)
+            return
+
+        if self._kind == "scalar":
+            if ch in ",}" or ch in _WHITESPACE:
+                self._finish_value(updates)
+                if ch == "}":
+                    self.done = True
+                elif ch == ",":
+                    self._state = "key_or_end"
+            else:
+                self._raw.append(ch)
+            return
+
+        # array / object: track nesting, ignoring brackets inside strings
+        self._raw.append(ch)
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+            elif ch == "\\":
+                self._escape = True
+            elif ch == '"':
+                self._in_string = False
+            return
+        if ch == '"':
+            self._in_string = True
+        elif ch in "[{":
+            self._depth += 1
+        elif ch in "]}":
+            self._depth -= 1
+            if self._depth == 0:
+                if self._kind == "array":
+                    self._complete_element(end=len(self._raw) - 1)
+                self._finish_value(updates)
+                return
+        if self._kind == "array" and self._depth == 1 and ch == ",":
+            self._complete_element(end=len(self._raw) - 1)
+            updates[self._key] = list(self._elements)
+            self.fields[self._key] = updates[self._key]
+
+    def _complete_element(self, end: int):
+        text = "".join(self._raw[self._element_start:end]).strip()
+        self._element_start = end + 1
+        if text:
+            try:
+                self._elements.append(json.loads(text))
+            except ValueError:
+                self._elements.append(text)
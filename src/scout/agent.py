@@ -1,19 +1,54 @@
-import boto3
+import contextvars
 import json
 import os
-from typing import List, Dict, Any
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Dict, Any, Optional
+from src.infrastructure.bedrock_gateway import get_bedrock_gateway
+from src.infrastructure.cache import (PersistentCache, cacheable_completion, get_llm_cache, llm_cache_key,
+                                      LLM_CACHE_BYPASS)
+from src.infrastructure.metrics import get_model_metrics, retry_attempts
+from src.infrastructure.tracing import span
+from src.scout.dedupe import cluster_near_duplicates
+
+# Relevance filtering: one prompt holds at most FILTER_BATCH_MAX_ITEMS
+# storylines. Larger feeds are split into batches of about
+# FILTER_BATCH_TOKEN_BUDGET tokens, scored in parallel, then re-ranked together.
+FILTER_BATCH_MAX_ITEMS = 50
+FILTER_BATCH_TOKEN_BUDGET = int(os.getenv("FILTER_BATCH_TOKEN_BUDGET", "6000"))
+FILTER_MAX_WORKERS = int(os.getenv("FILTER_MAX_WORKERS", "4"))
+FILTER_RERANK_MAX_ITEMS = int(os.getenv("FILTER_RERANK_MAX_ITEMS", "60"))
 
 class ScoutAgent:
-    def __init__(self, region_name: str = "us-east-1"):
-        self.bedrock = boto3.client("bedrock-runtime", region_name=region_name)
+    def __init__(self, region_name: str = "us-east-1", response_cache: Optional[PersistentCache] = None,
+                 bypass_cache: bool = LLM_CACHE_BYPASS):
+        self.bedrock = get_bedrock_gateway(region_name)
         # Reverting to Claude 3.5 Sonnet for stability
         self.model_id = "anthropic.claude-3-5-sonnet-20240620-v1:0" 
+        self.max_tokens = 2000
+        self.temperature = 0.1
+        self.response_cache = response_cache or get_llm_cache()
+        self.bypass_cache = bypass_cache
+
+    def _invoke_model(self, prompt: str, system_prompt: str = "", stage: str = "scout",
+                      validate: Optional[Callable[[str], Any]] = None) -> str:
+        """
+        Helper to invoke Claude 3.5 Sonnet on Bedrock. Every call is recorded under stage.
+
+        The completion is cached only if it was not cut off at max_tokens and
+        validate (the caller's parser, if given) accepts it.
+        """
+        metrics = get_model_metrics()
+        cache_key = llm_cache_key(self.model_id, system_prompt, prompt, self.temperature, self.max_tokens)
+        if not self.bypass_cache:
+            cached = self.response_cache.get_json(cache_key)
+            if cached is not None and cacheable_completion(cached, validate):
+                metrics.record(stage, self.model_id, outcome="cache_hit")
+                return cached
 
-    def _invoke_model(self, prompt: str, system_prompt: str = "") -> str:
-        """Helper to invoke Claude 3.5 Sonnet on Bedrock."""
         body = json.dumps({
             "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": 2000,
+            "max_tokens": self.max_tokens,
             "system": system_prompt,
             "messages": [
                 {
@@ -21,45 +56,130 @@ class ScoutAgent:
                     "content": prompt
                 }
             ],
-            "temperature": 0.1
+            "temperature": self.temperature
         })
         
+        started = time.perf_counter()
         try:
-            response = self.bedrock.invoke_model(
-                body=body,
-                modelId=self.model_id,
-                accept="application/json",
-                contentType="application/json"
-            )
+            with span("bedrock_invoke", cat="bedrock", stage=stage, prompt_chars=len(prompt)):
+                response = self.bedrock.invoke_model(
+                    body=body,
+                    modelId=self.model_id,
+                    accept="application/json",
+                    contentType="application/json"
+                )
             response_body = json.loads(response.get("body").read())
-            return response_body["content"][0]["text"]
+            text = response_body["content"][0]["text"]
         except Exception as e:
             print(f"Error invoking Bedrock: {e}")
+            metrics.record(stage, self.model_id, outcome="error",
+                           wall_ms=(time.perf_counter() - started) * 1000,
+                           retries=retry_attempts(e))
             return ""
 
+        usage = response_body.get("usage", {})
+        metrics.record(stage, self.model_id, input_tokens=usage.get("input_tokens", 0),
+                       output_tokens=usage.get("output_tokens", 0),
+                       wall_ms=(time.perf_counter() - started) * 1000,
+                       retries=retry_attempts(response))
+
+        if response_body.get("stop_reason") == "max_tokens":
+            print(f"  [{stage}] Completion hit max_tokens; not caching it.")
+        elif cacheable_completion(text, validate):
+            self.response_cache.set_json(cache_key, text)
+        return text
+
     # generate_queries method removed in favor of deterministic logic in lambda_handler
 
-    def filter_relevance(self, search_results: List[Dict[str, Any]], ticker: str) -> List[Dict[str, Any]]:
+    FILTER_SYSTEM_PROMPT = (
+        "You are a strict Senior Editor. Your goal is to curate a high-signal news feed for a Portfolio Manager.\n"
+        "1. ELIMINATE REDUNDANCY: If multiple articles cover the exact same event, keep ONLY the best source.\n"
+        "2. STRICT RELEVANCE: Discard generic market updates, 'top 10' lists, or minor price movements. Keep only MATERIAL events (earnings, reg action, M&A, supply chain).\n"
+        "3. RANKING: Score each item 1-10 on material impact."
+    )
+
+    def filter_relevance(self, search_results: List[Dict[str, Any]], ticker: str,
+                         chunked: Optional[bool] = None) -> List[Dict[str, Any]]:
         """
         Filters search results for direct relevance, removes duplicates, and ranks by impact.
         Returns a sorted list of relevant items.
+
+        Feeds larger than one prompt's worth (50 storylines) are filtered in
+        chunked mode: token-budgeted batches are scored by parallel model calls,
+        then the survivors are merged and re-ranked in a final pass. Pass
+        chunked=True/False to force either mode.
         """
         if not search_results:
             return []
-            
-        system_prompt = (
-            "You are a strict Senior Editor. Your goal is to curate a high-signal news feed for a Portfolio Manager.\n"
-            "1. ELIMINATE REDUNDANCY: If multiple articles cover the exact same event, keep ONLY the best source.\n"
-            "2. STRICT RELEVANCE: Discard generic market updates, 'top 10' lists, or minor price movements. Keep only MATERIAL events (earnings, reg action, M&A, supply chain).\n"
-            "3. RANKING: Score each item 1-10 on material impact."
-        )
-        
-        # We need to process this carefully. Limit to top 50 to avoid context overflow.
-        # Since we effectively random-sort raw results, taking top 50 is acceptable for now.
-        processed_results = search_results[:50]
         
+        # Collapse syndicated copies locally first, so the LLM only sees unique
+        # storylines and the 50-item window covers more of the feed.
+        storylines = cluster_near_duplicates(search_results)
+        print(f"  [{ticker}] Collapsed {len(search_results)} raw items into {len(storylines)} storylines.")
+
+        if chunked is None:
+            chunked = len(storylines) > FILTER_BATCH_MAX_ITEMS
+        if not chunked:
+            # We need to process this carefully. Limit to top 50 to avoid context overflow.
+            # Since we effectively random-sort raw results, taking top 50 is acceptable for now.
+            return self._score_batch(storylines[:FILTER_BATCH_MAX_ITEMS], ticker)
+
+        # Map: score every batch in parallel. Each batch validates its own ids.
+        batches = self._token_batches(storylines)
+        print(f"  [{ticker}] Filtering {len(storylines)} storylines in {len(batches)} batches...")
+        with ThreadPoolExecutor(max_workers=min(FILTER_MAX_WORKERS, len(batches))) as pool:
+            # Each batch runs in a copy of this thread's context so its model
+            # calls stay attributed to the holding being filtered.
+            futures = [pool.submit(contextvars.copy_context().run, self._score_batch, b, ticker) for b in batches]
+            selected = [item for future in futures for item in future.result()]
+
+        # Reduce: merge storylines split across batches and re-rank them together.
+        selected.sort(key=lambda x: x.get('relevance_score', 0), reverse=True)
+        return self._rerank(selected[:FILTER_RERANK_MAX_ITEMS], ticker)
+
+    @staticmethod
+    def _digest_line(i: int, r: Dict[str, Any]) -> str:
+        return (
+            f"ID: {i} | Title: {r.get('title')} | Snippet: {r.get('snippet')}"
+            + (f" | Also reported by {r['duplicate_count']} other outlets" if r.get('duplicate_count') else "")
+        )
+
+    def _token_batches(self, items: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """
+        Splits items into batches whose digest fits FILTER_BATCH_TOKEN_BUDGET
+        (estimated at ~4 characters per token) and FILTER_BATCH_MAX_ITEMS.
+        """
+        batches, current, used = [], [], 0
+        for item in items:
+            cost = len(self._digest_line(len(current), item)) // 4 + 1
+            if current and (used + cost > FILTER_BATCH_TOKEN_BUDGET or len(current) >= FILTER_BATCH_MAX_ITEMS):
+                batches.append(current)
+                current, used = [], 0
+            current.append(item)
+            used += cost
+        if current:
+            batches.append(current)
+        return batches
+
+    @staticmethod
+    def _parse_selection(response_text: str) -> List[Dict[str, Any]]:
+        import re
+        # Regex to find JSON block
+        json_match = re.search(r'\[.*\]', response_text.replace("\n", " "), re.DOTALL)
+        if json_match:
+            clean_text = json_match.group(0)
+        else:
+            # Try finding { if it's a single object (unlikely for list instructions but possible)
+            clean_text = response_text.replace("```json", "").replace("```", "").strip()
+        return json.loads(clean_text)
+
+    def _score_batch(self, processed_results: List[Dict[str, Any]], ticker: str) -> List[Dict[str, Any]]:
+        """
+        One filtering call over a batch of storylines. IDs in the prompt are
+        local to the batch and validated against it.
+        """
         results_digest = "\n".join([
-            f"ID: {i} | Title: {r.get('title')} | Snippet: {r.get('snippet')}" 
+            self._digest_line(i, r)
             for i, r in enumerate(processed_results)
         ])
         
@@ -73,24 +193,18 @@ class ScoutAgent:
             "Return JSON: a list of objects selected: [{'id': int, 'score': int, 'reason': str}, ...]"
         )
         
-        response_text = self._invoke_model(prompt, system_prompt)
+        response_text = self._invoke_model(prompt, self.FILTER_SYSTEM_PROMPT, stage="scout_filter",
+                                           validate=self._parse_selection)
         try:
-            import re
-            # Regex to find JSON block
-            json_match = re.search(r'\[.*\]', response_text.replace("\n", " "), re.DOTALL)
-            if json_match:
-                clean_text = json_match.group(0)
-            else:
-                # Try finding { if it's a single object (unlikely for list instructions but possible)
-                clean_text = response_text.replace("```json", "").replace("```", "").strip()
-
-            selected_items = json.loads(clean_text)
+            selected_items = self._parse_selection(response_text)
             
             final_results = []
+            seen = set()
             for item in selected_items:
                 idx = item.get('id')
                 # Validate index
-                if isinstance(idx, int) and 0 <= idx < len(processed_results):
+                if isinstance(idx, int) and 0 <= idx < len(processed_results) and idx not in seen:
+                    seen.add(idx)
                     article = processed_results[idx]
                     article['relevance_score'] = item.get('score', 0)
                     article['reason'] = item.get('reason', '')
@@ -114,6 +228,48 @@ class ScoutAgent:
                     unique[r['title']] = r
             return list(unique.values())[:10]
 
+    def _rerank(self, candidates: List[Dict[str, Any]], ticker: str) -> List[Dict[str, Any]]:
+        """
+        Final pass over the items selected by each batch: drops storylines that
+        were picked in more than one batch and re-scores everything on a single
+        scale. If the response can't be parsed the batch scores are kept.
+        """
+        if len(candidates) <= 1:
+            return candidates
+
+        results_digest = "\n".join([
+            f"{self._digest_line(i, r)} | Batch Score: {r.get('relevance_score')}"
+            for i, r in enumerate(candidates)
+        ])
+        prompt = (
+            f"Ticker: {ticker}\n"
+            f"Pre-selected Items (scored in separate batches):\n{results_digest}\n\n"
+            "Task:\n"
+            "1. These items were shortlisted from different parts of the feed, so the same storyline may appear more than once. Keep only the best article per storyline.\n"
+            "2. Re-score every kept item on one consistent scale (10 = Critical).\n\n"
+            "Return JSON: a list of objects selected: [{'id': int, 'score': int, 'reason': str}, ...]"
+        )
+
+        response_text = self._invoke_model(prompt, self.FILTER_SYSTEM_PROMPT, stage="scout_rerank",
+                                           validate=self._parse_selection)
+        try:
+            selected_items = self._parse_selection(response_text)
+            final_results = []
+            seen = set()
+            for item in selected_items:
+                idx = item.get('id')
+                if isinstance(idx, int) and 0 <= idx < len(candidates) and idx not in seen:
+                    seen.add(idx)
+                    article = candidates[idx]
+                    article['relevance_score'] = item.get('score', article.get('relevance_score', 0))
+                    article['reason'] = item.get('reason') or article.get('reason', '')
+                    final_results.append(article)
+            final_results.sort(key=lambda x: x.get('relevance_score', 0), reverse=True)
+            return final_results
+        except Exception as e:
+            print(f"Error re-ranking results for {ticker}, keeping batch scores: {e}")
+            return candidates
+
 
     def summarize_findings(self, relevant_news: List[Dict[str, Any]], ticker: str) -> str:
         """
@@ -134,4 +290,4 @@ class ScoutAgent:
             "Do NOT be generic. Be specific to the news provided."
         )
         
-        return self._invoke_model(prompt, system_prompt)
+        return self._invoke_model(prompt, system_prompt, stage="scout_summarize")
@@ -0,0 +1,110 @@
+import hashlib
+import re
+from typing import List, Dict, Any, Tuple
+
+SIMHASH_BITS = 64
+# Items whose fingerprints differ in at most this many bits are treated as the
+# same story. Unrelated texts sit around 32 bits apart.
+DEFAULT_MAX_DISTANCE = 6
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+# Trailing " - Publisher" / " | Publisher" tags added by aggregators.
+_PUBLISHER_SUFFIX_RE = re.compile(r"\s+[-|\u2013\u2014]\s+[A-Z][^-|\u2013\u2014]{0,39}$")
+
+
+def _title_key(item: Dict[str, Any]) -> str:
+    title = _PUBLISHER_SUFFIX_RE.sub("", item.get("title") or "")
+    return " ".join(_WORD_RE.findall(title.lower()))
+
+
+def _features(item: Dict[str, Any]) -> List[str]:
+    title = _title_key(item).split()
+    snippet = _WORD_RE.findall((item.get("snippet") or "").lower())
+    # Titles are what syndicated copies share most reliably, so they count twice.
+    words = title + title + snippet
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def simhash(item: Dict[str, Any]) -> int:
+    """64-bit SimHash over title and snippet words and word pairs."""
+    weights = [0] * SIMHASH_BITS
+    for feature in _features(item):
+        h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if (h >> bit) & 1 else -1
+    return sum(1 << bit for bit, w in enumerate(weights) if w > 0)
+
+
+def _bands(max_distance: int) -> List[Tuple[int, int]]:
+    """
+    (shift, width) of the bands candidate pairs are bucketed by. Two hashes
+    within max_distance bits must agree exactly on at least one of
+    (max_distance + 1) disjoint bands, so only same-bucket pairs need to be
+    compared. At SIMHASH_BITS or more every pair is a candidate.
+    """
+    if max_distance >= SIMHASH_BITS:
+        return [(0, 0)]
+    count = max_distance + 1
+    bounds = [band * SIMHASH_BITS // count for band in range(count + 1)]
+    return [(lo, hi - lo) for lo, hi in zip(bounds, bounds[1:])]
+
+
+def cluster_near_duplicates(items: List[Dict[str, Any]], max_distance: int = DEFAULT_MAX_DISTANCE) -> List[Dict[str, Any]]:
+    """
+    Collapses near-duplicate articles (syndicated copies, lightly edited
+    rewrites) into one representative per storyline.
+
+    The representative is the copy with the longest snippet. It gains
+    'duplicate_count' and 'duplicate_sources' describing the copies it
+    stands for. Storylines are returned in order of first appearance.
+    """
+    if len(items) < 2:
+        return list(items)
+
+    hashes = [simhash(item) for item in items]
+    parent = list(range(len(items)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(i, j):
+        ri, rj = find(i), find(j)
+        if ri != rj:
+            parent[max(ri, rj)] = min(ri, rj)
+
+    # Identical normalized titles are always the same story.
+    by_title: Dict[str, int] = {}
+    for i, item in enumerate(items):
+        title = _title_key(item)
+        if title:
+            union(i, by_title.setdefault(title, i))
+
+    for shift, width in _bands(max(0, max_distance)):
+        mask = (1 << width) - 1
+        buckets: Dict[int, List[int]] = {}
+        for i, h in enumerate(hashes):
+            buckets.setdefault((h >> shift) & mask, []).append(i)
+        for members in buckets.values():
+            for a in range(len(members)):
+                for b in range(a + 1, len(members)):
+                    i, j = members[a], members[b]
+                    if bin(hashes[i] ^ hashes[j]).count("1") <= max_distance:
+                        union(i, j)
+
+    clusters: Dict[int, List[int]] = {}
+    for i in range(len(items)):
+        clusters.setdefault(find(i), []).append(i)
+
+    representatives = []
+    for root in sorted(clusters):
+        members = clusters[root]
+        best = max(members, key=lambda i: len(items[i].get("snippet") or ""))
+        rep = items[best]
+        others = [items[i] for i in members if i != best]
+        rep["duplicate_count"] = len(others)
+        rep["duplicate_sources"] = [o.get("source") for o in others if o.get("source")]
+        representatives.append(rep)
+    return representatives
@@ -1,14 +1,422 @@
-import json
+import time
+_MODULE_IMPORT_STARTED = time.perf_counter()
+
+import hashlib
+import importlib
 import os
+import sys
+import traceback
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from src.scout.agent import ScoutAgent
 from src.scout.serp_client import SerpClient
 from src.scout.metadata import MetadataFetcher
+from src.infrastructure.output_format import dumps, event_score, latest_output_path, read_output
+from src.infrastructure.cache import LLM_CACHE_BYPASS
+from src.infrastructure.live_results import LiveResults
+from src.infrastructure.run_journal import RunJournal
+from src.infrastructure.metrics import get_model_metrics, holding_scope, METRICS_PATH
+from src.infrastructure.tracing import get_tracer, span, TRACE_ENABLED
+
+MODULE_IMPORT_MS = round((time.perf_counter() - _MODULE_IMPORT_STARTED) * 1000, 2)
+
+# Clients are built on the first invocation rather than at import, and live
+# for the life of the container, so warm invocations reuse their connection
+# pools. Anything assigned here before the first invocation (e.g. a fake in
+# the benchmarks) is kept.
+agent = None
+search_client = None
+metadata_fetcher = None
+
+# Historian, Advisor and Cloud Storage components, also kept across warm
+# invocations. A component that fails to build is retried on the next one.
+_components = {}
+
+# Heavy modules (yfinance, pandas, boto3, chromadb) are only imported when a
+# component needs them. Import time per module is recorded the first time it
+# is loaded and reported against this budget in the invocation's output.
+IMPORT_BUDGET_MS = float(os.getenv("SCOUT_IMPORT_BUDGET_MS", "3000"))
+IMPORT_TIMES_MS = {}
+
+_invocations = 0
+_start_latencies = {"cold": [], "warm": []}
+
+# Holdings are processed concurrently. Every stage is network bound (SerpApi,
+# Bedrock, Yahoo), so threads overlap well. Override per run with
+# event["max_workers"]; a value of 1 restores the strictly serial loop.
+DEFAULT_MAX_WORKERS = int(os.getenv("SCOUT_MAX_WORKERS", "8"))
+
+# Layout of data/scout_latest.json and the response body: "compact" shares
+# archetype performance across holdings, "compact.gz" also gzips the file,
+# "json" is the legacy fully-inlined layout. See output_format.py.
+OUTPUT_FORMAT = os.getenv("SCOUT_OUTPUT_FORMAT", "compact")
+OUTPUT_PATH = "data/scout_latest.json"
+
+# Delta mode: holdings whose deduplicated raw results match the previous run
+# carry that run's analysis forward instead of calling Bedrock, yfinance or
+# Chroma again. Results missing their summary or Advisor verdict are always
+# recomputed. Enable per run with event["delta"].
+DELTA_MODE = os.getenv("SCOUT_DELTA_MODE", "0") == "1"
+
+
+def _run_pool(fn, items, max_workers):
+    """
+    Applies fn to every item on a thread pool and returns results in input
+    order, so output never depends on which item finishes first.
+    """
+    if max_workers <= 1 or len(items) <= 1:
+        return [fn(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as pool:
+        return list(pool.map(fn, items))
+
+
+def _timed_import(module_name):
+    """Imports module_name, recording how long it took if it was not loaded yet."""
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    started = time.perf_counter()
+    module = importlib.import_module(module_name)
+    IMPORT_TIMES_MS[module_name] = round((time.perf_counter() - started) * 1000, 2)
+    return module
+
+
+def _init_clients():
+    global agent, search_client, metadata_fetcher
+    if agent is None:
+        _timed_import("boto3")
+        agent = ScoutAgent()
+    if search_client is None:
+        _timed_import("requests")
+        search_client = SerpClient()
+    if metadata_fetcher is None:
+        metadata_fetcher = MetadataFetcher()
+
+
+def _component(name, factory):
+    """Returns the warm component called name, building it with factory on first use (None on failure)."""
+    if name not in _components:
+        try:
+            with span(f"init_{name}", cat="run"):
+                _components[name] = factory()
+        except Exception as e:
+            print(f"{name} initialization failed: {e}")
+            return None
+    return _components[name]
+
+
+def _build_historian():
+    engine = _timed_import("src.historian.engine")
+    if engine.HISTORIAN_BACKEND == "chroma":
+        _timed_import("chromadb")
+    VectorEngine = engine.VectorEngine
+    HistoryFetcher = _timed_import("src.historian.history_fetcher").HistoryFetcher
+    return VectorEngine(), HistoryFetcher()
+
+
+def _build_advisor():
+    return _timed_import("src.reasoning.advisor").PortfolioAdvisor()
+
+
+def _build_cloud_storage():
+    return _timed_import("src.infrastructure.storage").CloudStorage(bucket_name="lplteam25")
+
+
+def _start_report(cold, imports_before, init_ms):
+    """Cold/warm start timings for this invocation, plus running figures for each kind."""
+    imports = {m: ms for m, ms in IMPORT_TIMES_MS.items() if m not in imports_before}
+    import_ms = round(sum(imports.values()) + (MODULE_IMPORT_MS if cold else 0), 2)
+    _start_latencies["cold" if cold else "warm"].append(init_ms)
+    if import_ms > IMPORT_BUDGET_MS:
+        print(f"WARNING: imports took {import_ms}ms, over the {IMPORT_BUDGET_MS}ms budget")
+
+    def summarize(values):
+        if not values:
+            return {"count": 0}
+        return {"count": len(values), "last_ms": values[-1], "mean_ms": round(sum(values) / len(values), 2)}
+
+    return {
+        "start": "cold" if cold else "warm",
+        "invocation": _invocations,
+        "module_import_ms": MODULE_IMPORT_MS if cold else 0,
+        "imports_ms": imports,
+        "import_ms": import_ms,
+        "import_budget_ms": IMPORT_BUDGET_MS,
+        "over_import_budget": import_ms > IMPORT_BUDGET_MS,
+        "init_ms": init_ms,
+        "cold_starts": summarize(_start_latencies["cold"]),
+        "warm_starts": summarize(_start_latencies["warm"])
+    }
+
+
+def _scoped(symbol, fn, *args, **kwargs):
+    """
+    Runs fn with symbol as the current holding, so its model calls and trace
+    spans are attributed to it.
+    """
+    with holding_scope(symbol), span(fn.__name__, cat="holding"):
+        return fn(*args, **kwargs)
+
+
+def _fingerprint(raw_results, stages=""):
+    """
+    Order-independent hash of the set of URLs collected for a holding, plus
+    the active stages, so a result from a run with e.g. the Advisor disabled
+    is not reused once it is enabled.
+    """
+    urls = sorted({r.get("url") or "" for r in raw_results})
+    return hashlib.sha256("\n".join([stages] + urls).encode("utf-8")).hexdigest()
+
+
+def _active_stages(historian_active, advisor_active):
+    return f"historian={int(historian_active)};advisor={int(advisor_active)}"
+
+
+# Verdicts that stand in for a missing assessment (e.g. an unparseable Advisor response)
+FAILED_VERDICTS = {"Unknown"}
+
+
+def _degraded(result, advisor_active):
+    """
+    True if a holding's result is missing parts it should have (no summary,
+    or no usable Advisor verdict while the Advisor is active). Such results
+    are never carried forward, so one outage does not freeze a blank
+    assessment until the news changes.
+    """
+    summary = result.get("summary") or ""
+    if not summary or summary.startswith("Processing Failed"):
+        return True
+    if advisor_active:
+        report = result.get("advisor_report") or {}
+        return not report or report.get("verdict") in FAILED_VERDICTS
+    return False
+
+
+def _load_previous_holdings():
+    """Holdings of the last saved run, or {} if there is none to compare against."""
+    path = latest_output_path(OUTPUT_PATH)
+    if not path:
+        return {}
+    try:
+        return read_output(path).get("data", {}).get("holdings", {})
+    except Exception as e:
+        print(f"Could not load previous run for delta mode: {e}")
+        return {}
+
+
+def _max_score(events):
+    """Highest relevance score among a holding's events (0 if none are numeric)."""
+    return max((event_score(e) for e in events), default=0)
+
+
+def _journaled(append, symbol, fn, *args, **kwargs):
+    """Runs fn and passes its result for symbol to a run journal append method as soon as it returns."""
+    result = fn(*args, **kwargs)
+    append(symbol, result)
+    return result
+
+
+def _live_updater(live, symbol):
+    """Callback publishing the Advisor's partial report for symbol to the live file (None without one)."""
+    if live is None:
+        return None
+    started = time.perf_counter()
+    announced = []
+
+    def on_update(partial, complete_fields):
+        if "verdict" in complete_fields and not announced:
+            announced.append(True)
+            print(f"    [{symbol}] Early verdict after {(time.perf_counter() - started):.1f}s: "
+                  f"{partial.get('verdict')}")
+        live.update(symbol, partial, complete_fields)
+
+    return on_update
+
+
+def _failed_result(error):
+    return {
+        "summary": f"Processing Failed: {error}",
+        "events": [],
+        "historical_context": [],
+        "advisor_report": {},
+        "recomputed": True
+    }
+
+
+def scout_holding(holding, cloud_storage=None, previous=None, stages="", advisor_active=False):
+    """
+    Stage 1 for a single holding: metadata, search, dedupe, filter and summarize.
+
+    Returns a dict with the symbol, the queries run, the summary and the
+    relevant events. Errors are caught and stored under "error" so one
+    failing holding never takes down the rest of the run.
+
+    previous is the holding's entry from the last run (delta mode). If its
+    fingerprint matches today's raw results and active stages, and it is not
+    degraded, that entry is returned under "carried" and filtering/summarizing
+    is skipped.
+    """
+    symbol = holding.get("symbol")
+    print(f"\nProcessing {symbol}...")
+    scouted = {"symbol": symbol, "queries": [], "summary": "", "events": [], "fingerprint": None,
+               "carried": None, "error": None}
+
+    try:
+        # A. Fetch Metadata
+        with span("metadata", cat="scout"):
+            meta = metadata_fetcher.get_metadata(symbol)
+        company_name = meta.get("name", symbol)
+        ceo_name = meta.get("ceo", "")
+        sector = meta.get("sector", "")
+
+        # B. Construct Deterministic Queries
+        queries = scouted["queries"]
+        queries.append(company_name)
+        if ceo_name and ceo_name != "Unknown":
+            queries.append(ceo_name)
+        if sector:
+            queries.append(f"{sector} News")
+
+        # C. Execute Search (all queries for the symbol in one concurrent fan-out)
+        print(f"  [{symbol}] Searching: {', '.join(queries)}")
+        with span("search", cat="scout", queries=len(queries)):
+            results_by_query = search_client.search_news_many(queries, days_back=2)
+        symbol_raw_results = []
+        for q in queries:
+            symbol_raw_results.extend(results_by_query.get(q, []))
+
+        # Deduplicate raw results for this symbol locally by URL first
+        with span("dedupe", cat="scout", raw=len(symbol_raw_results)):
+            seen_urls = set()
+            unique_raw = []
+            for r in symbol_raw_results:
+                if r['url'] not in seen_urls:
+                    seen_urls.add(r['url'])
+                    unique_raw.append(r)
+
+            print(f"  [{symbol}] Collected {len(unique_raw)} unique raw items.")
+            scouted["fingerprint"] = _fingerprint(unique_raw, stages)
+
+        # A.5 Upload Raw to S3 (Audit Trail)
+        if cloud_storage and unique_raw:
+            with span("s3_upload", cat="scout", items=len(unique_raw)):
+                cloud_storage.upload_raw_serp(symbol, unique_raw)
+
+        # Delta mode: same raw feed as last run, so reuse last run's analysis
+        if (previous and previous.get("fingerprint") == scouted["fingerprint"]
+                and not _degraded(previous, advisor_active)):
+            print(f"  [{symbol}] Unchanged since last run, carrying results forward.")
+            scouted["carried"] = previous
+            return scouted
+
+        # D. Filter Relevance & Deduplicate (Agentic)
+        print(f"  [{symbol}] Filtering & Ranking...")
+        with span("filter", cat="scout", items=len(unique_raw)):
+            scouted["events"] = agent.filter_relevance(unique_raw, ticker=symbol)
+
+        # E. Summarize (Agentic)
+        print(f"  [{symbol}] Analyzing...")
+        with span("summarize", cat="scout", events=len(scouted["events"])):
+            scouted["summary"] = agent.summarize_findings(scouted["events"], ticker=symbol)
+
+    except Exception as e:
+        print(f"ERROR Processing {symbol}: {e}")
+        traceback.print_exc()
+        scouted["error"] = e
+
+    return scouted
+
+
+def assess_holding(scouted, matches=None, performance=None, historian_engine=None, history_fetcher=None, advisor=None,
+                   live=None):
+    """
+    Stage 3 for a single holding: historical performance and the Advisor.
+
+    matches are the archetypes found by the batched Historian stage and
+    performance maps (ticker, period) to stats precomputed for them. When
+    either is missing (e.g. the batch query failed) the holding falls back
+    to its own find_matches / get_performance calls. Components passed as
+    None are inactive. Returns the holding's entry for scout_results["holdings"].
+
+    With a LiveResults writer, the Advisor streams and its partial report is
+    published as it arrives, so the verdict is visible before the run ends.
+    """
+    result = _assess(scouted, matches, performance, historian_engine, history_fetcher, advisor, live)
+    # Every holding, carried forward or failed included, ends up complete in
+    # the live file, so its done/expected count reaches the total.
+    if live:
+        live.update(scouted["symbol"], result.get("advisor_report") or {}, done=True)
+    return result
+
+
+def _assess(scouted, matches, performance, historian_engine, history_fetcher, advisor, live):
+    symbol = scouted["symbol"]
+    if scouted["error"]:
+        return _failed_result(scouted["error"])
+    if scouted["carried"]:
+        carried = scouted["carried"]
+        return {
+            "summary": carried.get("summary", ""),
+            "events": carried.get("events", []),
+            "historical_context": carried.get("historical_context", []),
+            "advisor_report": carried.get("advisor_report", {}),
+            "fingerprint": scouted["fingerprint"],
+            "recomputed": False
+        }
+
+    summary_text = scouted["summary"]
+    relevant_events = scouted["events"]
+
+    try:
+        # F. Historian Analysis (Contextual Intelligence)
+        historical_contexts = []
+        if history_fetcher and relevant_events:
+            if matches is None and historian_engine:
+                with span("historian_query", cat="historian"):
+                    matches = historian_engine.find_matches(summary_text, k=3)
+
+            for match in matches or []:
+                print(f"    [{symbol}] Match: {match['name']} (Dist: {match['distance']:.4f})")
+
+                # Fetch performance during that era
+                hist_ticker = match.get("ticker", symbol)
+
+                perf = (performance or {}).get((hist_ticker, match['period']))
+                if perf is None:
+                    with span("performance", cat="historian", ticker=hist_ticker):
+                        perf = history_fetcher.get_performance(hist_ticker, match['period'])
+
+                historical_contexts.append({
+                    "archetype": match,
+                    "performance": perf
+                })
+
+        # G. The Advisor (Strategic Reasoning)
+        advisor_report = {}
+        if advisor and summary_text:
+            print(f"  [{symbol}] Consulting Advisor (Reasoning Engine)...")
+            with span("advisor", cat="reasoning"):
+                advisor_report = advisor.analyze_risk(symbol, summary_text, historical_contexts,
+                                                      on_update=_live_updater(live, symbol))
+            print(f"    [{symbol}] Verdict: {advisor_report.get('verdict')} (Confidence: {advisor_report.get('confidence')}%)")
+
+        result = {
+            "summary": summary_text,
+            "events": relevant_events,
+            "historical_context": historical_contexts,
+            "advisor_report": advisor_report,
+            "fingerprint": scouted["fingerprint"],
+            "recomputed": True
+        }
+        # A degraded result gets no fingerprint, so the next run recomputes it
+        if _degraded(result, advisor is not None):
+            result["fingerprint"] = None
+        return result
+
+    except Exception as e:
+        print(f"ERROR Processing {symbol}: {e}")
+        traceback.print_exc()
+        return _failed_result(e)
 
-# Initialize clients
-agent = ScoutAgent()
-search_client = SerpClient()
-metadata_fetcher = MetadataFetcher()
 
 def lambda_handler(event, context):
     """
@@ -21,149 +429,198 @@ def lambda_handler(event, context):
     if not portfolio:
         return {"statusCode": 400, "body": "No portfolio provided"}
     
+    global _invocations
+    _invocations += 1
+    cold = _invocations == 1
+    imports_before = set(IMPORT_TIMES_MS)
+    init_started = time.perf_counter()
+
+    tracer = get_tracer()
+    tracer.start(bool(event.get("trace", TRACE_ENABLED)))
+    _init_clients()
+
     all_queries = []
     scout_results = {"holdings": {}}
-    
-    # Initialize Historian Components
-    from src.historian.engine import VectorEngine
-    from src.historian.history_fetcher import HistoryFetcher
-    # Initialize Reasoning Engine
-    from src.reasoning.advisor import PortfolioAdvisor
+    search_client.cache.reset_stats()
+    agent.response_cache.reset_stats()
+    model_metrics = get_model_metrics()
+    model_metrics.reset()
+    agent.bedrock.reset_stats()
+    bypass_llm_cache = bool(event.get("bypass_llm_cache", LLM_CACHE_BYPASS))
+    agent.bypass_cache = bypass_llm_cache
 
-    print("Initializing Components...")
-    try:
-        historian_engine = VectorEngine()
-        history_fetcher = HistoryFetcher()
-        historian_active = True
-    except Exception as e:
-        print(f"Historian initialization failed: {e}")
-        historian_active = False
-        
-    try:
-        advisor = PortfolioAdvisor()
-        advisor_active = True
-    except Exception as e:
-        print(f"Advisor initialization failed: {e}")
-        advisor_active = False
+    # Historian, Reasoning Engine and Cloud Storage: built once per container
+    print("Initializing Components..." if cold else "Reusing warm components...")
+    historian = _component("historian", _build_historian)
+    historian_active = historian is not None
+    historian_engine, history_fetcher = historian if historian_active else (None, None)
+    if historian_active:
+        historian_engine.embedding_cache.reset_stats()
 
-    # Initialize Cloud Storage
-    from src.infrastructure.storage import CloudStorage
-    try:
-        cloud_storage = CloudStorage(bucket_name="lplteam25")
-        cloud_active = True
-    except Exception as e:
-        print(f"Cloud Storage failed: {e}")
-        cloud_active = False
+    advisor = _component("advisor", _build_advisor)
+    advisor_active = advisor is not None
+    if advisor_active:
+        advisor.bypass_cache = bypass_llm_cache
 
-    # 2. Scout Loop per Symbol
-    for holding in portfolio:
-        symbol = holding.get("symbol")
-        print(f"\nProcessing {symbol}...")
-        
-        try:
-            # A. Fetch Metadata
-            meta = metadata_fetcher.get_metadata(symbol)
-            company_name = meta.get("name", symbol)
-            ceo_name = meta.get("ceo", "")
-            sector = meta.get("sector", "")
-            
-            # B. Construct Deterministic Queries
-            queries = [company_name]
-            if ceo_name and ceo_name != "Unknown":
-                queries.append(ceo_name)
-            if sector:
-                queries.append(f"{sector} News")
-            
-            all_queries.extend(queries)
-            
-            # C. Execute Search
-            symbol_raw_results = []
-            for q in queries:
-                print(f"  Searching: {q}")
-                results = search_client.search_news(q, days_back=2)
-                symbol_raw_results.extend(results)
-                
-            # Deduplicate raw results for this symbol locally by URL first
-            seen_urls = set()
-            unique_raw = []
-            for r in symbol_raw_results:
-                if r['url'] not in seen_urls:
-                    seen_urls.add(r['url'])
-                    unique_raw.append(r)
-    
-            print(f"  Collected {len(unique_raw)} unique raw items.")
-            
-            # A.5 Upload Raw to S3 (Audit Trail)
-            if cloud_active and unique_raw:
-                cloud_storage.upload_raw_serp(symbol, unique_raw)
-            
-            # D. Filter Relevance & Deduplicate (Agentic)
-            print("  Filtering & Ranking...")
-            relevant_events = agent.filter_relevance(unique_raw, ticker=symbol)
-            
-            # E. Summarize (Agentic)
-            print("  Analyzing...")
-            summary_text = agent.summarize_findings(relevant_events, ticker=symbol)
-            
-            # F. Historian Analysis (Contextual Intelligence)
-            historical_contexts = []
-            if historian_active and relevant_events:
-                print("  Consulting Historian (Top 3 Archetype Matches)...")
-                matches = historian_engine.find_matches(summary_text, k=3)
-                
-                for match in matches:
-                    print(f"    Match: {match['name']} (Dist: {match['distance']:.4f})")
-                    
-                    # Fetch performance during that era
-                    hist_ticker = match.get("ticker", symbol) 
-                    
-                    perf = history_fetcher.get_performance(hist_ticker, match['period'])
-                    
-                    historical_contexts.append({
-                        "archetype": match,
-                        "performance": perf
-                    })
-            
-            # G. The Advisor (Strategic Reasoning)
-            advisor_report = {}
-            if advisor_active and summary_text:
-                print("  Consulting Advisor (Reasoning Engine)...")
-                advisor_report = advisor.analyze_risk(symbol, summary_text, historical_contexts)
-                print(f"    Verdict: {advisor_report.get('verdict')} (Confidence: {advisor_report.get('confidence')}%)")
-
-            scout_results["holdings"][symbol] = {
-                "summary": summary_text,
-                "events": relevant_events,
-                "historical_context": historical_contexts,
-                "advisor_report": advisor_report
-            }
-            
-        except Exception as e:
-            print(f"ERROR Processing {symbol}: {e}")
-            import traceback
-            traceback.print_exc()
-            scout_results["holdings"][symbol] = {
-                "summary": f"Processing Failed: {e}",
-                "events": [],
-                "historical_context": [],
-                "advisor_report": {}
-            }
-            continue
+    cloud_storage = _component("cloud_storage", _build_cloud_storage)
+    cloud_active = cloud_storage is not None
+
+    init_ms = round((time.perf_counter() - init_started) * 1000, 2)
+    start_report = _start_report(cold, imports_before, init_ms)
+    print(f"{start_report['start'].capitalize()} start: init {init_ms}ms, imports {start_report['import_ms']}ms")
+
+    # 2a. Scout Stage per Symbol (fanned out across a worker pool)
+    max_workers = int(event.get("max_workers", DEFAULT_MAX_WORKERS))
+
+    # Resolve every symbol's metadata up front, concurrently, so the scout
+    # workers only read it from memory. Stats are taken here, before those reads.
+    metadata_fetcher.clear_memory()
+    metadata_fetcher.reset_stats()
+    with span("metadata_prefetch", cat="run", holdings=len(portfolio)):
+        metadata_fetcher.prefetch([holding.get("symbol") for holding in portfolio])
+    metadata_stats = metadata_fetcher.stats()
+
+    delta_mode = bool(event.get("delta", DELTA_MODE))
+    previous_holdings = _load_previous_holdings() if delta_mode else {}
+    stages = _active_stages(historian_active, advisor_active)
+
+    # Every holding is appended to data/runs/<run_id>.jsonl as soon as it is
+    # scouted and again once it is assessed, so a crash or timeout keeps the
+    # work done so far and the dashboard can follow the run. See run_journal.py.
+    journal = RunJournal()
+    journal.start([holding.get("symbol") for holding in portfolio])
+
+    print(f"Processing {len(portfolio)} holdings with {max_workers} worker(s)...")
+
+    with span("scout_stage", cat="run", max_workers=max_workers):
+        scouted = _run_pool(
+            lambda holding: _journaled(
+                journal.append_scouted,
+                holding.get("symbol"),
+                _scoped,
+                holding.get("symbol"),
+                scout_holding,
+                holding,
+                cloud_storage=cloud_storage if cloud_active else None,
+                previous=previous_holdings.get(holding.get("symbol")),
+                stages=stages,
+                advisor_active=advisor_active
+            ),
+            portfolio,
+            max_workers
+        )
+
+    # 2b. Historian Stage: one batched archetype lookup for every summarized holding
+    matches = [None] * len(scouted)
+    performance = {}
+    if historian_active:
+        pending = [i for i, s in enumerate(scouted) if not s["error"] and not s["carried"] and s["events"]]
+        if pending:
+            print(f"\nConsulting Historian for {len(pending)} holdings (Top 3 Archetype Matches)...")
+            try:
+                with span("historian_batch", cat="run", holdings=len(pending)):
+                    batch = historian_engine.find_matches_batch([scouted[i]["summary"] for i in pending], k=3)
+                for i, holding_matches in zip(pending, batch):
+                    matches[i] = holding_matches
+            except Exception as e:
+                print(f"Historian batch query failed, falling back to per-holding lookups: {e}")
+
+        # Archetype windows repeat across holdings; compute every distinct one in a single pass.
+        windows = [
+            (match.get("ticker", scouted[i]["symbol"]), match["period"])
+            for i in pending if matches[i]
+            for match in matches[i]
+        ]
+        if windows:
+            try:
+                with span("performance_batch", cat="run", windows=len(windows)):
+                    performance = dict(zip(windows, history_fetcher.get_performance_batch(windows)))
+            except Exception as e:
+                print(f"Historian performance batch failed, falling back to per-match lookups: {e}")
+
+    # 2c. Performance + Advisor Stage per Symbol. Holdings with the most
+    # material news go first, so their verdicts stream out earliest; results
+    # are put back in portfolio order afterwards.
+    live = LiveResults() if advisor_active and event.get("live", True) else None
+    if live:
+        live.start([s["symbol"] for s in scouted])
+    order = sorted(range(len(scouted)), key=lambda i: _max_score(scouted[i]["events"]), reverse=True)
+    with span("assess_stage", cat="run", max_workers=max_workers):
+        ordered_results = _run_pool(
+            lambda i: _journaled(
+                journal.append_holding,
+                scouted[i]["symbol"],
+                _scoped,
+                scouted[i]["symbol"],
+                assess_holding,
+                scouted[i],
+                matches=matches[i],
+                performance=performance,
+                historian_engine=historian_engine if historian_active else None,
+                history_fetcher=history_fetcher if historian_active else None,
+                advisor=advisor if advisor_active else None,
+                live=live
+            ),
+            order,
+            max_workers
+        )
+    results = [None] * len(scouted)
+    for i, result in zip(order, ordered_results):
+        results[i] = result
+    if live:
+        live.finish()
+
+    for holding_scout, result in zip(scouted, results):
+        all_queries.extend(holding_scout["queries"])
+        scout_results["holdings"][holding_scout["symbol"]] = result
 
     output = {
         "timestamp": datetime.now().isoformat(),
         "data": scout_results,
-        "config": {"queries_run": all_queries}
+        "config": {
+            "queries_run": all_queries,
+            "max_workers": max_workers,
+            "run_id": journal.run_id,
+            "search_cache": search_client.cache.stats(),
+            "metadata_cache": metadata_stats,
+            "llm_cache": {**agent.response_cache.stats(), "bypass": bypass_llm_cache},
+            "delta": {
+                "enabled": delta_mode,
+                "recomputed": [s for s, h in scout_results["holdings"].items() if h.get("recomputed", True)],
+                "carried_forward": [s for s, h in scout_results["holdings"].items() if not h.get("recomputed", True)]
+            }
+        }
     }
+    if historian_active:
+        output["config"]["embedding_cache"] = historian_engine.embedding_cache.stats()
+
+    # Tokens, wall time and estimated cost of every Bedrock call, per stage and per holding
+    output["config"]["model_usage"] = model_metrics.summary()
+    output["config"]["bedrock_gateway"] = agent.bedrock.stats()
+    output["config"]["lambda"] = start_report
+    try:
+        metrics_path = model_metrics.write(METRICS_PATH, extra={"timestamp": output["timestamp"]})
+        print(f"Saved model metrics to {metrics_path}")
+    except Exception as e:
+        print(f"Could not write model metrics: {e}")
     
-    # Save locally
-    os.makedirs("data", exist_ok=True)
-    with open("data/scout_latest.json", "w") as f:
-        json.dump(output, f, indent=2)
+    # Save locally: the consolidated snapshot is written atomically, then the
+    # journal is marked finished
+    output_format = event.get("output_format", OUTPUT_FORMAT)
+    with span("write_output", cat="run", format=output_format):
+        saved_path = journal.finalize(output, OUTPUT_PATH, output_format)
+    print(f"Saved results to {saved_path} ({output_format})")
+
+    try:
+        trace_path = tracer.write()
+        if trace_path:
+            print(f"Saved trace to {trace_path}")
+    except Exception as e:
+        print(f"Could not write trace: {e}")
         
     return {
         "statusCode": 200,
-        "body": json.dumps(output)
+        "body": dumps(output, "json" if output_format == "json" else "compact").decode("utf-8")
     }
 
     # 4. Save Results to Cloud (S3)
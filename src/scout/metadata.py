@@ -1,9 +1,44 @@
-import yfinance as yf
-from typing import Dict, Any
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+from src.infrastructure.cache import PersistentCache, get_cache
+from src.infrastructure.tracing import span
+
+DAY = 24 * 3600
+
+# Company name and sector almost never change; the CEO occasionally does.
+METADATA_FIELD_TTLS = {
+    "name": int(os.getenv("METADATA_NAME_TTL_SECONDS", str(30 * DAY))),
+    "sector": int(os.getenv("METADATA_SECTOR_TTL_SECONDS", str(30 * DAY))),
+    "ceo": int(os.getenv("METADATA_CEO_TTL_SECONDS", str(7 * DAY)))
+}
+# Placeholders stored for fields yfinance did not return (an ETF has no CEO)
+# are kept only this long, so a real value is picked up soon after it appears.
+METADATA_PLACEHOLDER_TTL = int(os.getenv("METADATA_PLACEHOLDER_TTL_SECONDS", str(DAY)))
+METADATA_CACHE_MAX_ENTRIES = int(os.getenv("METADATA_CACHE_MAX_ENTRIES", "20000"))
+METADATA_PREFETCH_WORKERS = int(os.getenv("METADATA_PREFETCH_WORKERS", "8"))
 
 class MetadataFetcher:
-    def __init__(self):
-        self.cache = {}
+    def __init__(self, cache: Optional[PersistentCache] = None):
+        # Persistent per-field store shared across cold starts, in front of
+        # yf.Ticker(...).info (one of the slowest yfinance endpoints).
+        self.cache = cache or get_cache("metadata", max(METADATA_FIELD_TTLS.values()), METADATA_CACHE_MAX_ENTRIES)
+        # Per-invocation copies of resolved entries; see clear_memory.
+        self._memory: Dict[str, Dict[str, str]] = {}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _load_cached(self, ticker_symbol: str) -> Optional[Dict[str, str]]:
+        """Returns the stored metadata if every field is still within its TTL."""
+        metadata = {}
+        for field in METADATA_FIELD_TTLS:
+            value = self.cache.get_json(f"meta|{ticker_symbol}|{field}")
+            if value is None:
+                return None
+            metadata[field] = value
+        return metadata
 
     def get_metadata(self, ticker_symbol: str) -> Dict[str, str]:
         """
@@ -12,32 +47,92 @@ class MetadataFetcher:
         - ceo: Name of the CEO
         - sector: Sector name
         """
-        if ticker_symbol in self.cache:
-            return self.cache[ticker_symbol]
+        if ticker_symbol in self._memory:
+            with self._lock:
+                self.hits += 1
+            return self._memory[ticker_symbol]
+
+        cached = self._load_cached(ticker_symbol)
+        if cached is not None:
+            with self._lock:
+                self.hits += 1
+            self._memory[ticker_symbol] = cached
+            return cached
+
+        with self._lock:
+            self.misses += 1
 
         try:
-            ticker = yf.Ticker(ticker_symbol)
-            info = ticker.info
-            
+            # Imported on first miss: yfinance (and pandas behind it) is the
+            # slowest import in the Scout, and warm runs rarely need it.
+            import yfinance as yf
+            with span("yfinance_info", cat="scout", ticker=ticker_symbol):
+                ticker = yf.Ticker(ticker_symbol)
+                info = ticker.info
+
             # Extract CEO
-            ceo = "CEO" # Fallback
+            ceo = None
             for officer in info.get("companyOfficers", []):
                 title = officer.get("title", "").upper()
                 if "CEO" in title or "CHIEF EXECUTIVE OFFICER" in title:
                     ceo = officer.get("name")
                     break
-            
-            metadata = {
-                "name": info.get("longName", ticker_symbol),
-                "sector": info.get("sector", "Business"),
-                "ceo": ceo
-            }
-            self.cache[ticker_symbol] = metadata
-            return metadata
+
+            found = {"name": info.get("longName"), "sector": info.get("sector"), "ceo": ceo}
+            fallback = self._fallback(ticker_symbol)
+            metadata = {field: found[field] or fallback[field] for field in METADATA_FIELD_TTLS}
+            # Any expired field refreshes all of them, since one .info call returns everything.
+            for field, ttl in METADATA_FIELD_TTLS.items():
+                if not found[field]:
+                    ttl = min(ttl, METADATA_PLACEHOLDER_TTL)
+                self.cache.set_json(f"meta|{ticker_symbol}|{field}", metadata[field], ttl_seconds=ttl)
         except Exception as e:
             print(f"Error fetching metadata for {ticker_symbol}: {e}")
+            # Remembered for this invocation only, so the scout loop does not
+            # call yfinance again after a failed prefetch
+            metadata = self._fallback(ticker_symbol)
+        self._memory[ticker_symbol] = metadata
+        return metadata
+
+    @staticmethod
+    def _fallback(ticker_symbol: str) -> Dict[str, str]:
+        return {
+            "name": ticker_symbol,
+            "sector": "Business",
+            "ceo": "CEO"
+        }
+
+    def prefetch(self, symbols: List[str], max_workers: int = METADATA_PREFETCH_WORKERS) -> Dict[str, Dict[str, str]]:
+        """
+        Resolves metadata for a whole portfolio concurrently, so the scout
+        loop only ever reads from memory. Returns metadata keyed by symbol.
+        """
+        unique = [s for s in dict.fromkeys(symbols) if s]
+        if not unique:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(unique))) as pool:
+            return dict(zip(unique, pool.map(self.get_metadata, unique)))
+
+    def stats(self) -> Dict[str, Any]:
+        """Symbol-level hit/miss counts (a miss is one yfinance .info call)."""
+        with self._lock:
+            lookups = self.hits + self.misses
             return {
-                "name": ticker_symbol,
-                "sector": "Business",
-                "ceo": "CEO"
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
             }
+
+    def clear_memory(self):
+        """
+        Drops the in-memory copies, so the next lookups re-check every field's
+        TTL in the persistent cache. Called at the start of each invocation:
+        a warm container would otherwise keep serving e.g. a CEO past its TTL.
+        """
+        with self._lock:
+            self._memory = {}
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
@@ -1,18 +1,20 @@
 import os
 import json
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from parallel import Parallel
 from dotenv import load_dotenv
+from src.infrastructure.cache import PersistentCache, get_search_cache, normalize_query
 
 load_dotenv()
 
 class ParallelClient:
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, cache: Optional[PersistentCache] = None):
         search_api_key = api_key or os.getenv("PARALLEL_API_KEY")
         if not search_api_key:
             raise ValueError("PARALLEL_API_KEY not found in environment variables or passed as argument.")
         
         self.client = Parallel(api_key=search_api_key)
+        self.cache = cache or get_search_cache()
 
     def search(self, query: str, num_results: int = 5, days_back: int = 2) -> List[Dict[str, Any]]:
         """
@@ -30,6 +32,11 @@ class ParallelClient:
         # Parallel API requires YYYY-MM-DD format for 'after_date'
         from datetime import datetime, timedelta
         date_threshold = (datetime.now() - timedelta(days=days_back)).strftime("%Y-%m-%d")
+
+        cache_key = f"parallel|{days_back}d|{num_results}|{normalize_query(query)}"
+        cached = self.cache.get_json(cache_key)
+        if cached is not None:
+            return cached
         
         try:
             # Using the identified method: client.beta.search(search_queries=[query], source_policy=...)
@@ -72,6 +79,7 @@ class ParallelClient:
                         "published_date": getattr(item, "published_date", "")
                     })
 
+            self.cache.set_json(cache_key, results)
             return results
         except Exception as e:
             print(f"Error executing Parallel search '{query}': {e}")
@@ -1,58 +1,150 @@
-from serpapi import GoogleSearch
+import contextvars
 import os
-from typing import List, Dict, Any
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
 from dotenv import load_dotenv
+from src.infrastructure.cache import PersistentCache, get_search_cache, normalize_query
+from src.infrastructure.tracing import span
 
 load_dotenv()
 
+SERPAPI_ENDPOINT = "https://serpapi.com/search"
+# SerpApi answers a search with no matches with HTTP 200 and this in "error"
+# ("Google hasn't returned any results for this query."); it is an empty
+# result, not a failure.
+NO_RESULTS_ERROR = "hasn't returned any results"
+
+# In-flight searches are capped per API key (SerpApi throttles per account),
+# so every SerpClient built with the same key shares one semaphore. The first
+# client for a key sets its limit; a later client asking for a different one
+# gets a warning and the existing limit, so the account cap always holds.
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("SERPAPI_MAX_CONCURRENCY", "4"))
+_key_semaphores: Dict[str, Tuple[threading.BoundedSemaphore, int]] = {}
+_key_semaphores_lock = threading.Lock()
+
+
+def _semaphore_for(api_key: str, limit: int) -> Tuple[threading.BoundedSemaphore, int]:
+    """The shared semaphore for api_key and the limit it was created with."""
+    with _key_semaphores_lock:
+        if api_key not in _key_semaphores:
+            _key_semaphores[api_key] = (threading.BoundedSemaphore(limit), limit)
+        semaphore, existing = _key_semaphores[api_key]
+    if existing != limit:
+        print(f"Warning: SerpApi concurrency for this API key is already {existing}; "
+              f"ignoring max_concurrency={limit}")
+    return semaphore, existing
+
+
 class SerpClient:
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 cache: Optional[PersistentCache] = None):
         self.api_key = api_key or os.getenv("SERPAPI_API_KEY")
         if not self.api_key:
             raise ValueError("SERPAPI_API_KEY not found.")
 
-    def search_news(self, query: str, days_back: int = 7) -> List[Dict[str, Any]]:
-        """
-        Searches Google News via SerpApi.
-        
-        Args:
-            query: The search query.
-            days_back: Freshness (e.g., 1 for 24h, 7 for week). 
-                       Maps to 'qdr:d' or 'qdr:w'.
-        """
+        self.cache = cache or get_search_cache()
+
+        self._slots, self.max_concurrency = _semaphore_for(self.api_key, max(1, max_concurrency))
+
+        # One keep-alive pool for every search made by this client, instead of
+        # a fresh connection (and TLS handshake) per GoogleSearch call.
+        import requests
+        from requests.adapters import HTTPAdapter
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_concurrency)
+        self.session.mount("https://", adapter)
+
+    def _build_params(self, query: str, days_back: int) -> Dict[str, Any]:
         # Map days to Google's 'tbs' (time based search) parameter
         time_period = "qdr:w" # Default week
         if days_back <= 1:
             time_period = "qdr:d"
         elif days_back <= 30:
             time_period = "qdr:m"
-            
-        params = {
+
+        return {
             "engine": "google",
             "tbm": "nws",
             "q": query,
             "tbs": time_period,
             "api_key": self.api_key,
             "gl": "us", # country
-            "hl": "en"  # language
+            "hl": "en", # language
+            "output": "json"
         }
 
+    def _fetch(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Executes one SerpApi request over the pooled session."""
+        with span("serp_request", cat="search", q=params.get("q")), self._slots:
+            response = self.session.get(SERPAPI_ENDPOINT, params=params, timeout=30)
+        if response.status_code != 200:
+            raise RuntimeError(f"SerpApi returned HTTP {response.status_code}: {response.text[:200]}")
+        results = response.json()
+        if "error" in results:
+            if NO_RESULTS_ERROR in str(results["error"]):
+                return {"news_results": []}
+            raise RuntimeError(results["error"])
+        return results
+
+    @staticmethod
+    def _standardize(results: Dict[str, Any]) -> List[Dict[str, Any]]:
+        standardized = []
+        for item in results.get("news_results", []):
+            standardized.append({
+                "title": item.get("title"),
+                "url": item.get("link"),
+                "snippet": item.get("snippet", "No snippet available"),
+                "source": item.get("source"),
+                "published_date": item.get("date")
+            })
+        return standardized
+
+    def search_news(self, query: str, days_back: int = 7) -> List[Dict[str, Any]]:
+        """
+        Searches Google News via SerpApi.
+
+        Args:
+            query: The search query.
+            days_back: Freshness (e.g., 1 for 24h, 7 for week).
+                       Maps to 'qdr:d' or 'qdr:w'.
+        """
+        params = self._build_params(query, days_back)
+        cache_key = f"serp|{params['tbm']}|{params['tbs']}|{normalize_query(query)}"
+        cached = self.cache.get_json(cache_key)
+        if cached is not None:
+            return cached
+
         try:
-            search = GoogleSearch(params)
-            results = search.get_dict()
-            news_results = results.get("news_results", [])
-            
-            # Standardize output
-            standardized = []
-            for item in news_results:
-                standardized.append({
-                    "title": item.get("title"),
-                    "url": item.get("link"),
-                    "snippet": item.get("snippet", "No snippet available"),
-                    "source": item.get("source"),
-                    "published_date": item.get("date")
-                })
-            return standardized
+            standardized = self._standardize(self._fetch(params))
         except Exception as e:
             print(f"Error executing SerpApi search '{query}': {e}")
             return []
+
+        # Successful searches are cached, including those with no results, so a
+        # rerun within the TTL makes no request at all; failures retry next run.
+        self.cache.set_json(cache_key, standardized)
+        return standardized
+
+    def search_news_many(self, queries: List[str], days_back: int = 7) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Runs several news searches concurrently over the shared connection pool.
+
+        Args:
+            queries: Search queries. Duplicates are only searched once.
+            days_back: Freshness window, same as search_news.
+
+        Returns:
+            Dict mapping each query to its standardized results. A failed
+            query maps to an empty list, exactly like search_news.
+        """
+        unique_queries = list(dict.fromkeys(queries))
+        if not unique_queries:
+            return {}
+
+        workers = min(len(unique_queries), self.max_concurrency)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # Run each search in a copy of the caller's context so traces keep the holding.
+            futures = [pool.submit(contextvars.copy_context().run, self.search_news, q, days_back)
+                       for q in unique_queries]
+            return dict(zip(unique_queries, [f.result() for f in futures]))